@@ -0,0 +1,8 @@
+"""
+Benchmarks for the invoice/HubSpot import converters.
+
+Synthetic, deterministic inputs (benchmarks.generators) so runs are comparable
+without the real exports:
+  python3 -m benchmarks.run --sizes 1k,100k
+  python3 -m benchmarks.generators zoho 100k /tmp/zoho_100k.csv
+"""
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic exports in the formats the converters read.
+
+Same (size, seed) -> byte-identical file, so benchmark runs are comparable.
+`rows` always means data rows in the file (Zoho: line-item rows, so fewer invoices).
+
+  python3 -m benchmarks.generators zoho 100k /tmp/zoho_100k.csv
+  python3 -m benchmarks.generators eboekhouden 1m /tmp/eb_1m.tsv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+DEFAULT_SEED = 20260113
+
+ZOHO_HEADER = [
+    "Invoice Date", "Invoice ID", "Invoice Number", "Invoice Status", "Customer Name", "Due Date",
+    "SubTotal", "Total", "Balance", "Item Name", "Item Desc", "Quantity", "Item Price", "Item Total",
+    "Item Tax %", "Item Tax Amount", "Notes",
+]
+EBOEKHOUDEN_HEADER = ["Datum", "Nummer", "Relatie", "Bedrag (Excl)", "Bedrag (Incl)", "Factuurtekst"]
+HUBSPOT_HEADER = [
+    "Record-ID", "Naam onderneming", "Eigenaar bedrijf", "Domeinnaam onderneming", "Website-URL",
+    "Telefoonnummer", "Adres", "Adres 2", "Postcode", "Plaats", "Provincie/regio", "Land/regio",
+    "Branche", "Beschrijving", "Aanmaakdatum",
+]
+
+_NAME_HEADS = ["Best", "Steck", "Dak", "Foo's", "Groen", "Van der", "Café", "Bouw", "Noord", "Schilders"]
+_NAME_TAILS = ["Bottles", "Expert", "Meester", "Bar", "Tuinen", "Berg", "Linde", "Groep", "Service", "Totaal"]
+_LEGAL = ["", "", " B.V.", " BV", " V.O.F.", " Holding B.V."]
+_CITIES = [("Amsterdam", "Noord-Holland"), ("Tilburg", "Noord-Brabant"), ("Utrecht", "Utrecht"),
+           ("Groningen", "Groningen"), ("Zwolle", "Overijssel"), ("Den Bosch", "Noord-Brabant")]
+_ITEMS = ["Website onderhoud", "SEO pakket", "Google Ads beheer", "Hosting", "Leads", "Dienstverlening"]
+_BRANCHES = ["Bouw", "Horeca", "Installatietechniek", "Retail", "Zakelijke dienstverlening"]
+
+
+def parse_size(text: str) -> int:
+    """'1k' -> 1_000, '100k' -> 100_000, '1m' -> 1_000_000, '2500' -> 2500."""
+    t = text.strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(t[-1:], 1)
+    return int(t[:-1] if mult > 1 else t) * mult
+
+
+def customer_names(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """A fixed customer pool; legal-suffix / spacing variants of the same company on purpose."""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        base = f"{_NAME_HEADS[i % len(_NAME_HEADS)]} {_NAME_TAILS[(i // len(_NAME_HEADS)) % len(_NAME_TAILS)]}"
+        if i >= len(_NAME_HEADS) * len(_NAME_TAILS):
+            base += f" {i}"
+        names.append(base + rng.choice(_LEGAL))
+    return names
+
+
+def _euros(cents: int) -> str:
+    return f"{cents / 100:.2f}"
+
+
+def _euros_nl(cents: int) -> str:
+    # 2254.68 -> "2.254,68"
+    return f"{cents / 100:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _invoice_date(rng: random.Random) -> date:
+    return date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+
+
+def write_zoho_csv(path: str, rows: int, seed: int = DEFAULT_SEED) -> int:
+    """Zoho Books invoice export: one row per line item, invoice columns repeated. Returns invoice count."""
+    rng = random.Random(seed)
+    customers = customer_names(max(10, rows // 40), seed)
+    written = invoices = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(ZOHO_HEADER)
+        while written < rows:
+            invoices += 1
+            n_items = min(rng.choice((1, 1, 2, 3, 4)), rows - written)
+            items = []
+            for _ in range(n_items):
+                qty = rng.choice((1, 1, 2, 3))
+                price = rng.randrange(2_500, 250_000)
+                tax_pct = rng.choice((21, 21, 21, 9, 0))
+                items.append((qty, price, qty * price, tax_pct, qty * price * tax_pct // 100))
+            subtotal = sum(it[2] for it in items)
+            total = subtotal + sum(it[4] for it in items)
+            d = _invoice_date(rng)
+            status = rng.choice(("Closed", "Closed", "Closed", "Open", "Overdue", "Void"))
+            balance = 0 if status in ("Closed", "Void") else total
+            note = rng.choice(("", "", "Bedankt voor uw opdracht", 'Factuur "spoed", 50% vooraf'))
+            customer = rng.choice(customers)
+            for qty, price, item_total, tax_pct, tax in items:
+                w.writerow([
+                    d.isoformat(), 900_000 + invoices, f"GS-{invoices:07d}", status, customer,
+                    (d + timedelta(days=14)).isoformat(), _euros(subtotal), _euros(total), _euros(balance),
+                    rng.choice(_ITEMS), rng.choice(("", "Maand " + str(d.month))), f"{qty:.2f}",
+                    _euros(price), _euros(item_total), tax_pct, _euros(tax), note,
+                ])
+                written += 1
+    return invoices
+
+
+def _eboekhouden_rows(rows: int, seed: int):
+    """
+    e-boekhouden rows. Every 10th number reuses a Zoho number (GS-...) so merge_dedupe
+    sees overlaps (and some amount conflicts); the rest are EB-... numbers.
+    """
+    rng = random.Random(seed + 1)
+    customers = customer_names(max(10, rows // 20), seed)
+    for i in range(rows):
+        number = f"GS-{i // 10 + 1:07d}" if i % 10 == 0 else f"EB-{i:07d}"
+        excl = rng.randrange(5_000, 500_000)
+        if rng.random() < 0.03:
+            excl = -excl  # credit note
+        incl = excl + excl * rng.choice((21, 21, 9, 0)) // 100
+        yield [
+            _invoice_date(rng).strftime("%d-%m-%Y"), number, rng.choice(customers),
+            _euros_nl(excl), _euros_nl(incl), rng.choice(("", "Website onderhoud", "Leads; maart")),
+        ]
+
+
+def write_eboekhouden_export(path: str, rows: int, seed: int = DEFAULT_SEED) -> int:
+    """Tab-separated e-boekhouden export with the report preamble above the header."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Facturen GrowSocial\nExport 13-01-2026\n\n")
+        f.write("\t".join(EBOEKHOUDEN_HEADER) + "\n")
+        for r in _eboekhouden_rows(rows, seed):
+            f.write("\t".join(r) + "\n")
+    return rows
+
+
+def write_eboekhouden_csv(path: str, rows: int, seed: int = DEFAULT_SEED) -> int:
+    """Semicolon e-boekhouden CSV (with BOM), as read by convert_eboekhouden_csv_to_sql.py."""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=";")
+        w.writerow(EBOEKHOUDEN_HEADER)
+        w.writerows(_eboekhouden_rows(rows, seed))
+    return rows
+
+
+def write_hubspot_companies(path: str, rows: int, seed: int = DEFAULT_SEED) -> int:
+    """HubSpot company export (Dutch UI column names), as read by import_hubspot_data.py."""
+    rng = random.Random(seed + 2)
+    customers = customer_names(rows, seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HUBSPOT_HEADER)
+        for i, name in enumerate(customers):
+            slug = "".join(ch for ch in name.lower() if ch.isalnum())[:30] or f"bedrijf{i}"
+            domain = f"{slug}.nl"
+            website = rng.choice((f"https://www.{domain}/", f"http://{domain}", domain, ""))
+            city, province = rng.choice(_CITIES)
+            if rng.random() < 0.02:
+                name = website = domain = ""  # empty rows exist in real exports
+            w.writerow([
+                10_000_000 + i, name, "Rogier", domain if rng.random() < 0.7 else "", website,
+                rng.choice(("", f"+31 6 {rng.randrange(10**7, 10**8)}", f"013-{rng.randrange(10**6, 10**7)}")),
+                f"Hoofdstraat {rng.randrange(1, 300)}", rng.choice(("", "", "Unit 2")),
+                f"{rng.randrange(1000, 9999)} AB", city, province, "Netherlands", rng.choice(_BRANCHES),
+                rng.choice(("", "Klant sinds 2021, \"vaste\" partner")), "2024-05-01",
+            ])
+    return rows
+
+
+GENERATORS: Dict[str, Callable[[str, int, int], int]] = {
+    "zoho": write_zoho_csv,
+    "eboekhouden": write_eboekhouden_export,
+    "eboekhouden-csv": write_eboekhouden_csv,
+    "hubspot": write_hubspot_companies,
+}
+SUFFIXES = {"zoho": ".csv", "eboekhouden": ".tsv", "eboekhouden-csv": ".csv", "hubspot": ".csv"}
+
+
+def ensure_input(data_dir: str, kind: str, rows: int, seed: int = DEFAULT_SEED) -> Path:
+    """Path of the (kind, rows, seed) input under data_dir; generated on first use."""
+    path = Path(data_dir) / f"{kind}_{rows}_{seed}{SUFFIXES[kind]}"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        GENERATORS[kind](str(tmp), rows, seed)
+        tmp.replace(path)
+    return path
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Write a synthetic export file.")
+    p.add_argument("kind", choices=sorted(GENERATORS))
+    p.add_argument("size", type=parse_size, help="data rows, e.g. 1k, 100k, 1m")
+    p.add_argument("out")
+    p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = p.parse_args()
+    GENERATORS[args.kind](args.out, args.size, args.seed)
+    print(f"✅ Wrote {args.out} ({args.size} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark the converters on synthetic inputs.
+
+  python3 -m benchmarks.run                       # 1k + 100k rows, every case
+  python3 -m benchmarks.run --sizes 1m --cases parse_zoho,generate_sql --json bench.json
+
+Every (case, size) runs in a fresh interpreter so peak RSS is per case. Reported:
+  seconds / rows_per_s / input_mb_per_s  - the measured stage only (setup excluded)
+  rss_before_mb / peak_rss_mb            - process RSS after setup / high-water mark
+  records                                - invoices or rows produced
+  output_bytes                           - size of the generated SQL (SQL stages)
+Inputs are generated once per (kind, size, seed) into --data-dir and reused.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.generators import DEFAULT_SEED, ensure_input, parse_size  # noqa: E402
+
+DEFAULT_SIZES = "1k,100k"
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "gs-import-bench")
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# A case: (input kinds, setup(paths) -> state, stage(state) -> (records, output_bytes)).
+# Only stage() is timed.
+Case = Tuple[Tuple[str, ...], Callable[[List[Path]], Any], Callable[[Any], Tuple[int, int]]]
+
+
+def _case_parse_zoho() -> Case:
+    from convert_all_invoices_to_sql import parse_zoho
+
+    return ("zoho",), lambda paths: paths[0], lambda p: (len(parse_zoho(str(p))[0]), 0)
+
+
+def _case_parse_eboekhouden() -> Case:
+    from convert_all_invoices_to_sql import parse_eboekhouden
+
+    return ("eboekhouden",), lambda paths: paths[0], lambda p: (len(parse_eboekhouden(str(p))[0]), 0)
+
+
+def _case_parse_eboekhouden_csv() -> Case:
+    from invoice_sources import read_source
+
+    return ("eboekhouden-csv",), lambda paths: paths[0], lambda p: (len(read_source("eboekhouden_semicolon", str(p))[0]), 0)
+
+
+def _case_parse_parallel() -> Case:
+    from convert_all_invoices_to_sql import parse_sources
+
+    def stage(paths):
+        (zoho, _), (eboek, _) = parse_sources(str(paths[0]), str(paths[1]), workers=os.cpu_count() or 1)
+        return len(zoho) + len(eboek), 0
+
+    return ("zoho", "eboekhouden"), lambda paths: paths, stage
+
+
+def _parsed(paths: List[Path]):
+    from convert_all_invoices_to_sql import parse_eboekhouden, parse_zoho
+
+    return parse_zoho(str(paths[0]))[0], parse_eboekhouden(str(paths[1]))[0]
+
+
+def _case_merge_dedupe() -> Case:
+    from convert_all_invoices_to_sql import merge_dedupe
+
+    def stage(state):
+        merged, _ = merge_dedupe(*state)
+        return len(merged), 0
+
+    return ("zoho", "eboekhouden"), _parsed, stage
+
+
+def _case_generate_sql() -> Case:
+    from convert_all_invoices_to_sql import generate_sql, merge_dedupe
+
+    def stage(merged):
+        return len(merged), len(generate_sql(merged).encode("utf-8"))
+
+    return ("zoho", "eboekhouden"), lambda paths: merge_dedupe(*_parsed(paths))[0], stage
+
+
+def _case_hubspot_generate_sql() -> Case:
+    import import_hubspot_data
+
+    def setup(paths):
+        out = Path(tempfile.mkdtemp(prefix="gs-bench-")) / "import_hubspot_data.sql"
+        with open(paths[0], "rb") as f:
+            rows = sum(1 for _ in f) - 1
+        return paths[0], out, rows
+
+    def stage(state):
+        src, out, rows = state
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_hubspot_data.generate_sql(str(src), str(out))
+        size = out.stat().st_size
+        out.unlink()
+        out.parent.rmdir()
+        return rows, size
+
+    return ("hubspot",), setup, stage
+
+
+CASES: Dict[str, Callable[[], Case]] = {
+    "parse_zoho": _case_parse_zoho,
+    "parse_eboekhouden": _case_parse_eboekhouden,
+    "parse_eboekhouden_csv": _case_parse_eboekhouden_csv,
+    "parse_parallel": _case_parse_parallel,
+    "merge_dedupe": _case_merge_dedupe,
+    "generate_sql": _case_generate_sql,
+    "hubspot_generate_sql": _case_hubspot_generate_sql,
+}
+
+
+def run_case(name: str, rows: int, data_dir: str, seed: int) -> Dict[str, Any]:
+    """Runs one case in this process (call it in a fresh one: RSS is a high-water mark)."""
+    kinds, setup, stage = CASES[name]()
+    paths = [ensure_input(data_dir, kind, rows, seed) for kind in kinds]
+    state = setup(paths)
+    rss_before = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    records, output_bytes = stage(state)
+    seconds = time.perf_counter() - t0
+
+    input_bytes = sum(p.stat().st_size for p in paths)
+    return {
+        "case": name,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_s": round(rows * len(paths) / seconds) if seconds else None,
+        "input_mb_per_s": round(input_bytes / 1e6 / seconds, 2) if seconds else None,
+        "rss_before_mb": round(rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "records": records,
+        "output_bytes": output_bytes,
+    }
+
+
+def _run_isolated(name: str, rows: int, data_dir: str, seed: int) -> Dict[str, Any]:
+    cmd = [sys.executable, "-m", "benchmarks.run", "--one", name, "--sizes", str(rows),
+           "--data-dir", data_dir, "--seed", str(seed)]
+    out = subprocess.run(cmd, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    cols = ["case", "rows", "seconds", "rows_per_s", "input_mb_per_s", "peak_rss_mb", "records", "output_bytes"]
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in cols]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(cols, widths)))
+
+
+def main(argv: List[str] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark the invoice/HubSpot converters on synthetic exports.")
+    p.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts, e.g. 1k,100k,1m")
+    p.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of: " + ", ".join(CASES))
+    p.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated inputs are cached")
+    p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    p.add_argument("--json", default=None, metavar="PATH", help="also write the results as JSON")
+    p.add_argument("--one", default=None, help=argparse.SUPPRESS)  # internal: run one case in-process
+    args = p.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    if args.one:
+        print(json.dumps(run_case(args.one, sizes[0], args.data_dir, args.seed)))
+        return 0
+
+    names = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = sorted(set(names) - set(CASES))
+    if unknown:
+        p.error(f"unknown case(s): {', '.join(unknown)}")
+
+    results = []
+    for rows in sizes:
+        for name in names:
+            results.append(_run_isolated(name, rows, args.data_dir, args.seed))
+            print(f"… {name} @ {rows}: {results[-1]['seconds']}s", file=sys.stderr)
+
+    _print_table(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
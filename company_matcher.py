@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Fuzzy company matching (HubSpot companies -> public.customers) in Python.
+
+Replaces all-pairs `LIKE '%' || name || '%'` style matching with blocking:
+customers are put in an inverted index on normalized name tokens and on domain,
+and only customers sharing a (not too common) token or the domain with a
+HubSpot row are scored. Cost grows with rows x candidates, not rows x customers.
+
+  python3 company_matcher.py hubspot-export.csv customers.csv -o hubspot_matches.csv
+  python3 import_hubspot_data.py hubspot-export.csv out.sql --customers customers.csv
+
+The customers source is a CSV dump or a postgresql:// DSN (see customer_snapshot.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from customer_aliases import LEGAL_FORM_TOKENS, alias_tokens
+from customer_snapshot import DOMAIN_COLUMNS, customer_domain_key, read_customer_rows
+from import_hubspot_data import HUBSPOT_COLUMNS, compile_row_extractor, iter_hubspot_records
+
+DEFAULT_MIN_SCORE = 0.85
+
+# Tokens that postings lists are not built from when they are in more than this many
+# customers ("bouw", "groep", ...): they don't narrow anything down.
+DEFAULT_MAX_BLOCK_SIZE = 500
+
+# Best score must beat the best other customer by this much
+AMBIGUITY_MARGIN = 0.02
+
+
+def name_tokens(name: str) -> Tuple[str, ...]:
+    """alias_tokens() without legal-form tokens ("Best Bottles B.V." = "Best Bottles")."""
+    return tuple(t for t in alias_tokens(name) if t not in LEGAL_FORM_TOKENS)
+
+
+@dataclass
+class Match:
+    customer_id: str
+    customer_name: str
+    score: float
+    method: str  # domain | exact | containment | fuzzy
+
+
+@dataclass
+class CompanyMatcher:
+    """Inverted index over customers: name token -> customer indexes, domain -> customer indexes."""
+
+    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE
+    ids: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    # per customer: the token tuples of company_name and name (either may be empty)
+    tokens: List[Tuple[Tuple[str, ...], ...]] = field(default_factory=list)
+    by_token: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_domain: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+
+    def add(self, row: Dict[str, str]) -> None:
+        cid = (row.get("id") or "").strip()
+        if not cid:
+            return
+        i = len(self.ids)
+        self.ids.append(cid)
+        self.names.append(row.get("company_name") or row.get("name") or "")
+        variants = tuple(t for t in {name_tokens(row.get("company_name") or ""), name_tokens(row.get("name") or "")} if t)
+        self.tokens.append(variants)
+        for tok in {t for v in variants for t in v}:
+            self.by_token[tok].append(i)
+        for col in DOMAIN_COLUMNS:
+            d = customer_domain_key(row.get(col) or "")
+            if d and (not self.by_domain[d] or self.by_domain[d][-1] != i):
+                self.by_domain[d].append(i)
+
+    def _candidates(self, tokens: Tuple[str, ...]) -> Set[int]:
+        postings = sorted((self.by_token[t] for t in set(tokens) if t in self.by_token), key=len)
+        if not postings:
+            return set()
+        selective = [p for p in postings if len(p) <= self.max_block_size]
+        if selective:
+            out: Set[int] = set()
+            for p in selective:
+                out.update(p)
+            return out
+        # Only common tokens: candidates must share all of them (fall back to the rarest one)
+        out = set(postings[0])
+        for p in postings[1:]:
+            narrowed = out.intersection(p)
+            if not narrowed:
+                break
+            out = narrowed
+        return out
+
+    @staticmethod
+    def score(query: Tuple[str, ...], candidate: Tuple[str, ...], floor: float = 0.0) -> Tuple[float, str]:
+        """
+        (score 0..1, method) for two token tuples. Fuzzy scores that can't reach `floor`
+        are cut short via difflib's cheap upper bounds and returned as 0.0.
+        """
+        if query == candidate:
+            return 1.0, "exact"
+        if _contains(query, candidate):
+            # One name contains the other, like the old LIKE '%...%' ("Best Bottles" / "Best Bottles Groep"):
+            # scored by how much of the longer name is covered.
+            q, c = set(query), set(candidate)
+            return 0.75 + 0.2 * len(q & c) / len(q | c), "containment"
+        a, b = " ".join(query), " ".join(candidate)
+        # = SequenceMatcher.real_quick_ratio(), without building the matcher
+        if 2 * min(len(a), len(b)) < floor * (len(a) + len(b)):
+            return 0.0, "fuzzy"
+        sm = SequenceMatcher(None, a, b, autojunk=False)
+        if sm.quick_ratio() < floor:
+            return 0.0, "fuzzy"
+        # Typos ("Janssen" / "Jansen") score high; no shared token at all costs 10%
+        ratio = sm.ratio()
+        return (ratio if set(query).intersection(candidate) else 0.9 * ratio), "fuzzy"
+
+    def match(self, company_name: str, domain: Optional[str] = None, min_score: Optional[float] = None) -> Optional[Match]:
+        """
+        Best customer for a HubSpot company, or None below min_score. None as well when
+        another customer scores (nearly) the same: an ambiguous match isn't a match.
+        """
+        if min_score is None:
+            min_score = DEFAULT_MIN_SCORE
+        d = customer_domain_key(domain or "")
+        if d and self.by_domain.get(d):
+            i = self.by_domain[d][0]
+            return Match(self.ids[i], self.names[i], 1.0, "domain")
+
+        query = name_tokens(company_name)
+        if not query:
+            return None
+        # Scores of customers other than the best one only matter down to the ambiguity margin
+        floor = min_score - AMBIGUITY_MARGIN
+        best: Optional[Tuple[float, int, str]] = None
+        runner_up = 0.0
+        for i in self._candidates(query):
+            s, method = max(self.score(query, variant, floor) for variant in self.tokens[i])
+            if best is None or s > best[0] or (s == best[0] and i < best[1]):
+                if best is not None:
+                    runner_up = max(runner_up, best[0])
+                best = (s, i, method)
+            else:
+                runner_up = max(runner_up, s)
+        if best is None or best[0] < min_score or best[0] - runner_up < AMBIGUITY_MARGIN:
+            return None
+        s, i, method = best
+        return Match(self.ids[i], self.names[i], round(s, 4), method)
+
+
+def _contains(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """True when the shorter token tuple occurs as a contiguous run in the longer one."""
+    short, long_ = (a, b) if len(a) <= len(b) else (b, a)
+    n = len(short)
+    return any(long_[k : k + n] == short for k in range(len(long_) - n + 1))
+
+
+def build_matcher(rows: Iterable[Dict[str, str]], max_block_size: int = DEFAULT_MAX_BLOCK_SIZE) -> CompanyMatcher:
+    matcher = CompanyMatcher(max_block_size=max_block_size)
+    for row in rows:
+        matcher.add(row)
+    return matcher
+
+
+def load_matcher(source: str, max_block_size: int = DEFAULT_MAX_BLOCK_SIZE) -> CompanyMatcher:
+    """CSV dump path or postgresql:// DSN."""
+    return build_matcher(read_customer_rows(source), max_block_size)
+
+
+def write_matches(hubspot_csv: str, matcher: CompanyMatcher, out_path: str, min_score: float = DEFAULT_MIN_SCORE) -> Dict[str, int]:
+    """HubSpot row -> customer mapping CSV (one line per matched row); returns counts per method."""
+    counts: Dict[str, int] = defaultdict(int)
+    with open(hubspot_csv, "r", encoding="utf-8", newline="") as f, open(out_path, "w", encoding="utf-8", newline="") as out:
+        reader = csv.reader(f)
+        extract, min_len = compile_row_extractor(next(reader), HUBSPOT_COLUMNS)
+        w = csv.writer(out)
+        w.writerow(["hubspot_row", "company_name", "domain", "customer_id", "customer_name", "confidence", "method"])
+        for row_no, rec in enumerate(iter_hubspot_records(reader, extract, min_len), start=1):
+            company_name, domain = rec[0], rec[1]
+            m = matcher.match(company_name, domain, min_score)
+            counts["rows"] += 1
+            if m is None:
+                counts["unmatched"] += 1
+                continue
+            counts[m.method] += 1
+            w.writerow([row_no, company_name, domain or "", m.customer_id, m.customer_name, f"{m.score:.4f}", m.method])
+    return dict(counts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Match HubSpot companies to customers (blocking + similarity scores).")
+    p.add_argument("hubspot_csv")
+    p.add_argument("customers", help="customers CSV dump or postgresql:// DSN")
+    p.add_argument("-o", "--output", default="hubspot_matches.csv")
+    p.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE)
+    p.add_argument("--max-block-size", type=int, default=DEFAULT_MAX_BLOCK_SIZE)
+    args = p.parse_args(argv)
+
+    matcher = load_matcher(args.customers, args.max_block_size)
+    counts = write_matches(args.hubspot_csv, matcher, args.output, args.min_score)
+    print(f"✅ Wrote {args.output}")
+    print(f"- HubSpot rows: {counts.get('rows', 0)}, unmatched: {counts.get('unmatched', 0)}")
+    for method in ("domain", "exact", "containment", "fuzzy"):
+        print(f"- {method}: {counts.get(method, 0)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
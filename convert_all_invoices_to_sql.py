@@ -9,39 +9,62 @@ without creating duplicates when the same invoice exists in both exports.
 
 Default inputs match the user's Downloads folder, but you can pass paths:
   python3 convert_all_invoices_to_sql.py /path/to/zoho.csv /path/to/eboekhouden.tsv
+
+The Zoho export is streamed invoice-by-invoice (rows are grouped by Invoice ID);
+pass --zoho-unsorted for exports that aren't grouped (external sort on disk).
+--parse-workers N parses both exports concurrently (and big Zoho files in chunks).
+
+--format copy / copy-csv writes a COPY ... FROM STDIN block into a staging table
+instead of one VALUES literal (much faster for big sets; run it with psql -f).
+--dsn postgresql://... skips the SQL file and loads directly (see invoice_db_loader.py).
+--customers customers.csv resolves customer ids client-side (see customer_snapshot.py).
+--manifest import_manifest.json only emits new/changed invoices (see import_manifest.py).
+--profile prints where the time went per stage (see import_profile.py).
+--resume continues a run that died after its last completed batch (see import_checkpoint.py).
+
+The parsers below are also registered as source adapters (see invoice_sources.py),
+which the single-export converters and new exports share. Delimiter, encoding and
+header line of each file are sniffed from its first KBs (see export_format.py), so the
+semicolon e-boekhouden CSV works as the second input too.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import heapq
+import io
 import json
+import mmap
+import os
 import re
 import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from dataclasses import dataclass, field
+from collections.abc import Sequence as SequenceABC
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from customer_aliases import AliasStore, load_alias_store
+from export_format import ExportFormat, assumed_format, open_export, sniff_export, sniff_export_or
+from import_checkpoint import ImportCheckpoint, checkpoint_path_for, open_checkpoint, open_resumable, plan_digest
+from import_profile import PROFILER, cprofile_to, stage, timed
 
 
 DEFAULT_ZOHO_CSV = "/Users/rogierschoenmakers/Downloads/Factuur (1).csv"
 DEFAULT_EBOEKHOUDEN_EXPORT = "/Users/rogierschoenmakers/Downloads/Facturen GrowSocial 13-01-2026.csv"
 
 
-CUSTOMER_ALIASES: Dict[str, str] = {
-    # Explicit mappings you provided earlier
-    "Best Bottles B.V.": "Jouwgeboortewijn",
-    "Werken bij The Workspot": "The Workspot",
-    "Klusbedrijf Sluijter": "Dakbeheer Acuut",
-    "Tofiek": "Amsterdam Design",
-    "Anroluca": "Dakmeester Nederland",
-    "LIKE IT HARDER BOOKINGS": "Like It Harder",
-    "Koos Kluytmans Interieurs B.V.": "Koos Kluytmans",
-    "Steck 013": "Steck013",
-    "Dakpreventie van der Steen B.V.": "Dakpreventie van der Steen",
-    "Jd-dakexpert": "JD Dakexpert",
-}
+# Export customer name -> platform customer name (customer_aliases.json, see customer_aliases.py).
+# main() swaps in --aliases PATH.
+CUSTOMER_ALIASES: AliasStore = load_alias_store()
 
 #
 # If an invoice_number exists in both exports, Zoho is preferred by default.
@@ -58,6 +81,11 @@ def _d2(x: Decimal) -> Decimal:
     return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
+def _whole_cents(x: Decimal) -> int:
+    """An amount in (fractional) cents rounded half-up to whole cents."""
+    return int(x.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
 def parse_decimal_maybe_eu(s: str) -> Decimal:
     """
     Parses either:
@@ -101,8 +129,119 @@ def parse_date_nl(s: str) -> Optional[datetime]:
         return None
 
 
+# Columnar fast paths: the common cell shapes are parsed without regex search /
+# Decimal / strptime; anything else falls back to the per-cell parsers above.
+_PLAIN_DECIMAL = re.compile(r"(-?)(\d+)(?:\.(\d{1,2}))?")
+_EU_DECIMAL = re.compile(r"(-?)(\d{1,3}(?:\.\d{3})+|\d+),(\d{1,2})")
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_NL_DATE = re.compile(r"(\d{2})-(\d{2})-(\d{4})")
+
+
+def cents_from_str(s: str) -> int:
+    """
+    Exact integer cents (half-up) for any value parse_decimal_maybe_eu() accepts.
+    "1185.80" / "-12" / "3.5" / "-1.185,8" take the fast path; odd values go through Decimal.
+    """
+    s = (s or "").strip()
+    m = _PLAIN_DECIMAL.fullmatch(s)
+    if m:
+        sign, whole, frac = m.groups()
+        cents = int(whole) * 100 + (int(frac.ljust(2, "0")) if frac else 0)
+        return -cents if sign else cents
+    m = _EU_DECIMAL.fullmatch(s)
+    if m:
+        sign, whole, frac = m.groups()
+        cents = int(whole.replace(".", "")) * 100 + int(frac.ljust(2, "0"))
+        return -cents if sign else cents
+    return int(_d2(parse_decimal_maybe_eu(s)) * 100)
+
+
+def parse_cents_column(values: Sequence[str]) -> List[int]:
+    """cents_from_str() over a whole column; repeated cells are parsed once."""
+    memo: Dict[str, int] = {}
+    out: List[int] = []
+    for v in values:
+        c = memo.get(v)
+        if c is None:
+            c = memo[v] = cents_from_str(v)
+        out.append(c)
+    return out
+
+
+def _date_column(values: Sequence[str], pattern: "re.Pattern[str]", ymd: Tuple[int, int, int], fallback) -> List[Optional[datetime]]:
+    memo: Dict[str, Optional[datetime]] = {}
+    out: List[Optional[datetime]] = []
+    for v in values:
+        if v in memo:
+            out.append(memo[v])
+            continue
+        m = pattern.fullmatch((v or "").strip())
+        if m:
+            g = m.groups()
+            try:
+                d: Optional[datetime] = datetime(int(g[ymd[0]]), int(g[ymd[1]]), int(g[ymd[2]]))
+            except ValueError:
+                d = None
+        else:
+            d = fallback(v)
+        memo[v] = d
+        out.append(d)
+    return out
+
+
+@lru_cache(maxsize=1 << 14)
+def cached_date_iso(s: str) -> Optional[datetime]:
+    """parse_date_iso() with the fast path, memoized: per-row parsers see the same dates over and over."""
+    return _date_column((s,), _ISO_DATE, (0, 1, 2), parse_date_iso)[0]
+
+
+@lru_cache(maxsize=1 << 14)
+def cached_date_nl(s: str) -> Optional[datetime]:
+    """parse_date_nl() with the fast path, memoized."""
+    return _date_column((s,), _NL_DATE, (2, 1, 0), parse_date_nl)[0]
+
+
+def parse_iso_date_column(values: Sequence[str]) -> List[Optional[datetime]]:
+    """parse_date_iso() over a whole column (YYYY-MM-DD fast path)."""
+    return _date_column(values, _ISO_DATE, (0, 1, 2), parse_date_iso)
+
+
+def parse_nl_date_column(values: Sequence[str]) -> List[Optional[datetime]]:
+    """parse_date_nl() over a whole column (DD-MM-YYYY fast path)."""
+    return _date_column(values, _NL_DATE, (2, 1, 0), parse_date_nl)
+
+
+class Money(int):
+    """
+    An amount in integer cents. Half-up rounding happens once, at parse time;
+    sums and differences are exact. Arithmetic returns a plain int, wrap it with Money().
+    str() gives the exact euro amount ("-1234.50").
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, s: str) -> "Money":
+        return cls(cents_from_str(s))
+
+    def euros(self) -> float:
+        return int(self) / 100
+
+    def sql(self) -> str:
+        q, r = divmod(abs(int(self)), 100)
+        return f"{'-' if self < 0 else ''}{q}.{r:02d}"
+
+    __str__ = sql
+
+    def __repr__(self) -> str:
+        return f"Money({self.sql()})"
+
+
+ZERO = Money(0)
+
+
 def order_number_from_date(d: datetime) -> str:
-    return f"ORD-{d.strftime('%Y%m%d')}"
+    return f"ORD-{d.year:04d}{d.month:02d}{d.day:02d}"
 
 
 def normalize_invoice_number(n: str) -> str:
@@ -110,390 +249,1162 @@ def normalize_invoice_number(n: str) -> str:
 
 
 def normalize_customer_name(n: str) -> str:
-    n = (n or "").strip()
-    return CUSTOMER_ALIASES.get(n, n)
+    return CUSTOMER_ALIASES.resolve(n)
+
+
+def customer_match_key(n: str) -> Optional[str]:
+    """Python twin of public.customer_match_key(): lowercase, alphanumerics only."""
+    key = "".join(ch for ch in (n or "").lower() if ch.isalnum())
+    return key or None
 
 
 def sql_quote(s: str) -> str:
     return "'" + (s or "").replace("\\", "\\\\").replace("'", "''") + "'"
 
 
-def jsonb_literal(obj: Any) -> str:
+def _json_default(o: Any):
     # Make sure decimals are serialized nicely
-    def _default(o: Any):
-        if isinstance(o, Decimal):
-            return float(_d2(o))
-        raise TypeError(f"not json serializable: {type(o)}")
+    if isinstance(o, Decimal):
+        return float(_d2(o))
+    raise TypeError(f"not json serializable: {type(o)}")
 
-    return "$$" + json.dumps(obj, ensure_ascii=False, default=_default) + "$$::jsonb"
 
+def json_text(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=_json_default)
+
+
+def line_items_json(items: Sequence["LineItem"]) -> str:
+    return json_text([item.to_json() for item in items])
+
+
+def jsonb_literal(obj: Any) -> str:
+    return "$$" + json_text(obj) + "$$::jsonb"
 
-@dataclass
+
+def chunked(items: List[Any], size: Optional[int]) -> List[List[Any]]:
+    """
+    Splits `items` into batches of `size` (None/0 = one batch with everything).
+    Always returns at least one (possibly empty) batch.
+    """
+    if not size or size <= 0:
+        return [list(items)]
+    return [items[i : i + size] for i in range(0, len(items), size)] or [[]]
+
+
+@dataclass(slots=True)
+class LineItem:
+    description: str
+    quantity: float  # int 1 for e-boekhouden (kept as-is so the JSON doesn't change)
+    unit_price: Money
+    has_vat: bool
+    subtotal: Money
+    vat_amount: Money
+    total: Money
+
+    def to_json(self) -> Dict[str, Any]:
+        # json.dumps() writes int subclasses as plain ints, so Money -> euros happens here.
+        return {
+            "description": self.description,
+            "quantity": self.quantity,
+            "unit_price": self.unit_price.euros(),
+            "has_vat": self.has_vat,
+            "subtotal": self.subtotal.euros(),
+            "vat_amount": self.vat_amount.euros(),
+            "total": self.total.euros(),
+        }
+
+
+@dataclass(slots=True)
 class CanonicalInvoice:
     invoice_number: str
     invoice_date: datetime
     due_date: Optional[datetime]
     customer_name: str
-    amount_incl: Decimal
-    outstanding_amount: Decimal
+    amount_incl: Money
+    outstanding_amount: Money
     status: str
     order_number: str
     notes: str
-    line_items: List[Dict[str, Any]] = field(default_factory=list)
+    line_items: List[LineItem] = field(default_factory=list)
     external_id: Optional[str] = None
     external_system: str = "zoho_books"  # or eboekhouden
 
 
-def parse_zoho(zoho_csv_path: str) -> Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]:
-    by_invoice_id: Dict[str, Dict[str, Any]] = {}
-    items_by_invoice_id: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+class InvoiceColumns(SequenceABC):
+    """
+    Column-array store for big invoice sets: one array per field (amounts as int64
+    cents, dates as ordinals, repeated strings interned) instead of one object per
+    invoice and per line item. Indexing rebuilds CanonicalInvoice objects on demand,
+    so it can be passed anywhere a list of invoices is read (generate_sql & co.).
+    """
 
-    with open(zoho_csv_path, "r", encoding="utf-8-sig", newline="") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            inv_id = (row.get("Invoice ID") or "").strip()
-            inv_no = normalize_invoice_number(row.get("Invoice Number") or "")
-            if not inv_id or not inv_no:
-                continue
+    def __init__(self, invoices: Iterable[CanonicalInvoice] = ()):
+        self.invoice_number: List[str] = []
+        self.invoice_date = array("l")
+        self.due_date = array("l")  # 0 = no due date
+        self.customer_name: List[str] = []
+        self.amount_incl = array("q")
+        self.outstanding_amount = array("q")
+        self.status: List[str] = []
+        self.order_number: List[str] = []
+        self.notes: List[str] = []
+        self.external_id: List[Optional[str]] = []
+        self.external_system: List[str] = []
+        # line items, flattened; invoice i owns items item_offsets[i]:item_offsets[i + 1]
+        self.item_offsets = array("q", [0])
+        self.item_description: List[str] = []
+        self.item_quantity: List[float] = []
+        self.item_unit_price = array("q")
+        self.item_has_vat = array("b")
+        self.item_subtotal = array("q")
+        self.item_vat_amount = array("q")
+        self.item_total = array("q")
+        for inv in invoices:
+            self.append(inv)
+
+    def append(self, inv: CanonicalInvoice) -> None:
+        intern = sys.intern
+        self.invoice_number.append(inv.invoice_number)
+        self.invoice_date.append(inv.invoice_date.toordinal())
+        self.due_date.append(inv.due_date.toordinal() if inv.due_date else 0)
+        self.customer_name.append(intern(inv.customer_name))
+        self.amount_incl.append(inv.amount_incl)
+        self.outstanding_amount.append(inv.outstanding_amount)
+        self.status.append(intern(inv.status))
+        self.order_number.append(intern(inv.order_number))
+        self.notes.append(intern(inv.notes))
+        self.external_id.append(inv.external_id)
+        self.external_system.append(intern(inv.external_system))
+        for it in inv.line_items:
+            self.item_description.append(intern(it.description))
+            self.item_quantity.append(it.quantity)
+            self.item_unit_price.append(it.unit_price)
+            self.item_has_vat.append(it.has_vat)
+            self.item_subtotal.append(it.subtotal)
+            self.item_vat_amount.append(it.vat_amount)
+            self.item_total.append(it.total)
+        self.item_offsets.append(len(self.item_description))
+
+    def __len__(self) -> int:
+        return len(self.invoice_number)
+
+    def _item(self, j: int) -> LineItem:
+        return LineItem(
+            description=self.item_description[j],
+            quantity=self.item_quantity[j],
+            unit_price=Money(self.item_unit_price[j]),
+            has_vat=bool(self.item_has_vat[j]),
+            subtotal=Money(self.item_subtotal[j]),
+            vat_amount=Money(self.item_vat_amount[j]),
+            total=Money(self.item_total[j]),
+        )
 
-            inv_date = parse_date_iso(row.get("Invoice Date") or "")
-            if not inv_date:
-                continue
+    def _invoice(self, i: int) -> CanonicalInvoice:
+        due = self.due_date[i]
+        return CanonicalInvoice(
+            invoice_number=self.invoice_number[i],
+            invoice_date=datetime.fromordinal(self.invoice_date[i]),
+            due_date=datetime.fromordinal(due) if due else None,
+            customer_name=self.customer_name[i],
+            amount_incl=Money(self.amount_incl[i]),
+            outstanding_amount=Money(self.outstanding_amount[i]),
+            status=self.status[i],
+            order_number=self.order_number[i],
+            notes=self.notes[i],
+            line_items=[self._item(j) for j in range(self.item_offsets[i], self.item_offsets[i + 1])],
+            external_id=self.external_id[i],
+            external_system=self.external_system[i],
+        )
 
-            due_date = parse_date_iso(row.get("Due Date") or "")
-            customer_name = normalize_customer_name(row.get("Customer Name") or "")
-
-            total = _d2(parse_decimal_maybe_eu(row.get("Total") or "0"))
-            balance = _d2(parse_decimal_maybe_eu(row.get("Balance") or "0"))
-            inv_status = (row.get("Invoice Status") or "").strip().lower()
-
-            # Map status + outstanding
-            if total < 0:
-                status = "cancelled"
-                outstanding = Decimal("0")
-            elif balance > 0:
-                status = "pending"
-                outstanding = balance
-            else:
-                # 'closed' in Zoho means fully paid
-                status = "paid" if inv_status in ("closed", "paid") else "pending"
-                outstanding = Decimal("0") if status == "paid" else balance
-
-            # line item
-            qty = parse_decimal_maybe_eu(row.get("Quantity") or "1")
-            unit_price = _d2(parse_decimal_maybe_eu(row.get("Item Price") or "0"))
-            item_subtotal = _d2(parse_decimal_maybe_eu(row.get("Item Total") or "0"))
-            item_tax_amount = _d2(parse_decimal_maybe_eu(row.get("Item Tax Amount") or "0"))
-            item_total = _d2(item_subtotal + item_tax_amount)
-
-            item_name = (row.get("Item Name") or "").strip()
-            item_desc = (row.get("Item Desc") or "").strip()
-            description = (item_name or "").strip()
-            if item_desc:
-                description = (description + " — " + item_desc).strip(" —")
-            description = description or "Dienstverlening"
-
-            has_vat = item_tax_amount > 0
-
-            items_by_invoice_id[inv_id].append(
-                {
-                    "description": description[:300],
-                    "quantity": float(_d2(qty)),
-                    "unit_price": float(unit_price),
-                    "has_vat": bool(has_vat),
-                    "subtotal": float(item_subtotal),
-                    "vat_amount": float(item_tax_amount),
-                    "total": float(item_total),
-                }
-            )
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._invoice(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._invoice(i)
 
-            # store invoice-level fields once (first row wins; totals/dates are repeated anyway)
-            if inv_id not in by_invoice_id:
-                by_invoice_id[inv_id] = {
-                    "invoice_number": inv_no,
-                    "invoice_date": inv_date,
-                    "due_date": due_date,
-                    "customer_name": customer_name,
-                    "amount_incl": total,
-                    "outstanding_amount": outstanding,
-                    "status": status,
-                    "external_id": inv_id,
-                    "external_system": "zoho_books",
-                    "notes": "Geïmporteerd uit Zoho Books",
-                }
 
-    invoices: Dict[str, CanonicalInvoice] = {}
-    for inv_id, meta in by_invoice_id.items():
-        inv_date = meta["invoice_date"]
-        invoices[inv_id] = CanonicalInvoice(
-            invoice_number=meta["invoice_number"],
-            invoice_date=inv_date,
-            due_date=meta["due_date"] or (inv_date + timedelta(days=14)),
-            customer_name=meta["customer_name"],
-            amount_incl=_d2(meta["amount_incl"]),
-            outstanding_amount=_d2(meta["outstanding_amount"]),
-            status=meta["status"],
-            order_number=order_number_from_date(inv_date),
-            notes=meta["notes"],
-            line_items=items_by_invoice_id.get(inv_id, []),
-            external_id=meta["external_id"],
-            external_system=meta["external_system"],
-        )
+ZOHO_SORT_CHUNK_ROWS = 50_000
 
-    report = {
-        "zoho_invoice_count": len(invoices),
-        "zoho_line_rows": sum(len(v) for v in items_by_invoice_id.values()),
+# Without a recognizable header (renamed columns, ...) a Zoho file is read as plain utf-8 CSV
+ZOHO_FORMAT = assumed_format("zoho", ",")
+
+
+def _zoho_format(zoho_csv_path: str) -> ExportFormat:
+    return sniff_export_or(zoho_csv_path, ("zoho",), ZOHO_FORMAT)
+
+
+# Numeric Zoho columns (with the default used for empty cells) and date columns.
+ZOHO_AMOUNT_COLUMNS: Dict[str, str] = {
+    "Total": "0",
+    "Balance": "0",
+    "Quantity": "1",
+    "Item Price": "0",
+    "Item Total": "0",
+    "Item Tax Amount": "0",
+}
+ZOHO_DATE_COLUMNS = ("Invoice Date", "Due Date")
+ZOHO_COLUMNAR_BLOCK_ROWS = 10_000
+
+ZOHO_IMPORT_NOTE = "Geïmporteerd uit Zoho Books"
+ZOHO_DEFAULT_VAT_RATE = Decimal("0.21")
+
+
+@dataclass(frozen=True)
+class ZohoRules:
+    """How Zoho rows map to invoice fields where the converters differ (merged import: the defaults)."""
+
+    # The export's Notes column as the invoice notes (ZOHO_IMPORT_NOTE when empty)
+    notes_column: bool = False
+    # Balance 0 means paid whatever the Invoice Status (convert_csv_to_sql.py); default: only Closed/Paid
+    zero_balance_paid: bool = False
+    # has_vat from Item Tax % and, when Item Tax Amount is empty, ZOHO_DEFAULT_VAT_RATE of Item Total;
+    # default: has_vat and the VAT straight from Item Tax Amount
+    vat_from_percent: bool = False
+    # Item Price 0 -> Item Total / Quantity as the unit price
+    unit_price_fallback: bool = False
+    # Rows without Item Name and Item Desc add no line item (their invoice is kept);
+    # default: a "Dienstverlening" line item
+    skip_itemless_rows: bool = False
+
+
+ZOHO_RULES = ZohoRules()
+
+
+def _zoho_cells(row: Dict[str, str]) -> Dict[str, Any]:
+    """Per-cell path: parsed amounts (int cents) and dates for one row."""
+    cells: Dict[str, Any] = {col: cents_from_str(row.get(col) or d) for col, d in ZOHO_AMOUNT_COLUMNS.items()}
+    for col in ZOHO_DATE_COLUMNS:
+        cells[col] = parse_date_iso(row.get(col) or "")
+    return cells
+
+
+def _zoho_cells_block(rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Columnar path: parses each amount/date column of a block of rows in one go."""
+    columns: Dict[str, List[Any]] = {
+        col: parse_cents_column([r.get(col) or d for r in rows]) for col, d in ZOHO_AMOUNT_COLUMNS.items()
+    }
+    for col in ZOHO_DATE_COLUMNS:
+        columns[col] = parse_iso_date_column([r.get(col) or "" for r in rows])
+    names = list(columns)
+    return [dict(zip(names, vals)) for vals in zip(*columns.values())]
+
+
+def _zoho_rows_with_cells(
+    rows: Iterable[Dict[str, str]], columnar: bool
+) -> Iterator[Tuple[Dict[str, str], Dict[str, Any]]]:
+    if not columnar:
+        for row in rows:
+            yield row, _zoho_cells(row)
+        return
+    block: List[Dict[str, str]] = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= ZOHO_COLUMNAR_BLOCK_ROWS:
+            yield from zip(block, _zoho_cells_block(block))
+            block = []
+    if block:
+        yield from zip(block, _zoho_cells_block(block))
+
+
+def _zoho_row(
+    row: Dict[str, str], cells: Optional[Dict[str, Any]] = None, rules: ZohoRules = ZOHO_RULES
+) -> Optional[Tuple[str, Dict[str, Any], Optional[LineItem]]]:
+    """
+    Parses one Zoho line-row into (invoice_id, invoice-level fields, line item).
+    `cells` are the pre-parsed amounts/dates (columnar path); parsed here if omitted.
+    `rules`: notes/status/line item differences between the converters (ZohoRules);
+    the line item is None for a row rules.skip_itemless_rows skips.
+    Returns None for rows that can't be imported (no id/number/date).
+    """
+    inv_id = (row.get("Invoice ID") or "").strip()
+    inv_no = normalize_invoice_number(row.get("Invoice Number") or "")
+    if not inv_id or not inv_no:
+        return None
+
+    if cells is None:
+        cells = _zoho_cells(row)
+
+    inv_date = cells["Invoice Date"]
+    if not inv_date:
+        return None
+
+    due_date = cells["Due Date"]
+    customer_name = normalize_customer_name(row.get("Customer Name") or "")
+
+    total = Money(cells["Total"])
+    balance = Money(cells["Balance"])
+    inv_status = (row.get("Invoice Status") or "").strip().lower()
+
+    # Map status + outstanding
+    if total < 0:
+        status = "cancelled"
+        outstanding = ZERO
+    elif balance > 0:
+        status = "pending"
+        outstanding = balance
+    else:
+        # 'closed' in Zoho means fully paid
+        paid = inv_status in ("closed", "paid") or (rules.zero_balance_paid and balance == 0)
+        status = "paid" if paid else "pending"
+        outstanding = ZERO if status == "paid" else balance
+
+    meta = {
+        "invoice_number": inv_no,
+        "invoice_date": inv_date,
+        "due_date": due_date,
+        "customer_name": customer_name,
+        "amount_incl": total,
+        "outstanding_amount": outstanding,
+        "status": status,
+        "external_id": inv_id,
+        "external_system": "zoho_books",
+        "notes": ((row.get("Notes") or "").strip() if rules.notes_column else "") or ZOHO_IMPORT_NOTE,
     }
+
+    # line item
+    item_name = (row.get("Item Name") or "").strip()
+    item_desc = (row.get("Item Desc") or "").strip()
+    if rules.skip_itemless_rows and not (item_name or item_desc):
+        return inv_id, meta, None
+    description = (item_name or "").strip()
+    if item_desc:
+        description = (description + " — " + item_desc).strip(" —")
+    description = description or "Dienstverlening"
+
+    unit_price = Money(cells["Item Price"])
+    item_subtotal = Money(cells["Item Total"])
+    item_tax_amount = Money(cells["Item Tax Amount"])
+    if rules.unit_price_fallback and unit_price <= 0 and cells["Quantity"] > 0:
+        unit_price = Money(_whole_cents(Decimal(item_subtotal) * 100 / cells["Quantity"]))
+
+    if rules.vat_from_percent:
+        has_vat = parse_decimal_maybe_eu(row.get("Item Tax %") or "") > 0
+        if item_tax_amount <= 0 and has_vat:
+            item_tax_amount = Money(_whole_cents(item_subtotal * ZOHO_DEFAULT_VAT_RATE))
+    else:
+        has_vat = item_tax_amount > 0
+    item_total = Money(item_subtotal + item_tax_amount)
+
+    item = LineItem(
+        description=description[:300],
+        quantity=cells["Quantity"] / 100,
+        unit_price=unit_price,
+        has_vat=bool(has_vat),
+        subtotal=item_subtotal,
+        vat_amount=item_tax_amount,
+        total=item_total,
+    )
+    return inv_id, meta, item
+
+
+def _zoho_invoice(meta: Dict[str, Any], items: List[LineItem]) -> CanonicalInvoice:
+    inv_date = meta["invoice_date"]
+    return CanonicalInvoice(
+        invoice_number=meta["invoice_number"],
+        invoice_date=inv_date,
+        due_date=meta["due_date"] or (inv_date + timedelta(days=14)),
+        customer_name=meta["customer_name"],
+        amount_incl=meta["amount_incl"],
+        outstanding_amount=meta["outstanding_amount"],
+        status=meta["status"],
+        order_number=order_number_from_date(inv_date),
+        notes=meta["notes"],
+        line_items=items,
+        external_id=meta["external_id"],
+        external_system=meta["external_system"],
+    )
+
+
+def _zoho_rows_sorted(zoho_csv_path: str, chunk_rows: int = ZOHO_SORT_CHUNK_ROWS) -> Iterator[Dict[str, str]]:
+    """
+    External sort of a Zoho export on Invoice ID.
+
+    Rows are read in chunks of `chunk_rows`, each chunk is sorted and spilled to a
+    temp file, and the runs are k-way merged. The original row number is part of the
+    sort key so rows of one invoice keep their export order ("first row wins" still holds).
+    """
+    with tempfile.TemporaryDirectory(prefix="zoho_sort_") as tmp:
+        runs: List[Path] = []
+        fmt = _zoho_format(zoho_csv_path)
+        with open_export(zoho_csv_path, fmt) as f:
+            r = csv.reader(f, delimiter=fmt.delimiter)
+            header = next(r, None)
+            if header is None:
+                return
+            id_col = header.index("Invoice ID") if "Invoice ID" in header else None
+            if id_col is None:
+                return
+
+            def _spill(chunk: List[List[str]]) -> None:
+                chunk.sort(key=lambda x: (x[1], int(x[0])))
+                run = Path(tmp) / f"run_{len(runs):05d}.csv"
+                with open(run, "w", encoding="utf-8", newline="") as out:
+                    csv.writer(out).writerows(chunk)
+                runs.append(run)
+
+            chunk: List[List[str]] = []
+            for seq, row in enumerate(r):
+                inv_id = row[id_col].strip() if len(row) > id_col else ""
+                chunk.append([str(seq), inv_id, *row])
+                if len(chunk) >= chunk_rows:
+                    _spill(chunk)
+                    chunk = []
+            if chunk:
+                _spill(chunk)
+
+        handles = [open(run, "r", encoding="utf-8", newline="") for run in runs]
+        try:
+            merged = heapq.merge(*(csv.reader(h) for h in handles), key=lambda x: (x[1], int(x[0])))
+            for rec in merged:
+                yield dict(zip(header, rec[2:]))
+        finally:
+            for h in handles:
+                h.close()
+
+
+def iter_zoho_invoices(
+    zoho_csv_path: str,
+    stats: Optional[Dict[str, Any]] = None,
+    presorted: bool = True,
+    columnar: bool = False,
+    rules: ZohoRules = ZOHO_RULES,
+) -> Iterator[CanonicalInvoice]:
+    """
+    Streams CanonicalInvoice objects from a Zoho export, one per Invoice ID.
+
+    Zoho exports are grouped by Invoice ID, so an invoice is yielded as soon as its
+    rows end; peak memory is one invoice instead of the whole file.
+    With presorted=False the rows are external-sorted on disk first (unsorted files).
+    A presorted stream that turns out not to be grouped raises ValueError.
+    columnar=True parses amounts/dates per block of rows, column by column.
+    `rules` picks the notes/status/line item mapping (ZohoRules; default: the merged import's).
+
+    `stats` (optional) is filled with zoho_invoice_count / zoho_line_rows / zoho_skipped_rows.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(_zoho_stats())
+
+    if presorted:
+        fmt = _zoho_format(zoho_csv_path)
+        f = open_export(zoho_csv_path, fmt)
+        rows: Iterable[Dict[str, str]] = csv.DictReader(f, delimiter=fmt.delimiter)
+    else:
+        f = None
+        rows = _zoho_rows_sorted(zoho_csv_path)
+    try:
+        yield from _group_zoho_rows(rows, stats, columnar, rules)
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _zoho_stats() -> Dict[str, Any]:
+    return {"zoho_invoice_count": 0, "zoho_line_rows": 0, "zoho_skipped_rows": {}}
+
+
+def _skip_reason(row: Dict[str, str]) -> str:
+    # Why _zoho_row() returned None (only evaluated for skipped rows)
+    if not (row.get("Invoice ID") or "").strip() or not normalize_invoice_number(row.get("Invoice Number") or ""):
+        return "missing_id_or_number"
+    return "missing_date"
+
+
+def _group_zoho_rows(
+    rows: Iterable[Dict[str, str]], stats: Dict[str, Any], columnar: bool, rules: ZohoRules = ZOHO_RULES
+) -> Iterator[CanonicalInvoice]:
+    """Rows grouped by Invoice ID -> invoices; ValueError when an Invoice ID comes back."""
+    done_ids = set()
+    cur_id: Optional[str] = None
+    cur_meta: Optional[Dict[str, Any]] = None
+    cur_items: List[LineItem] = []
+    for row, cells in _zoho_rows_with_cells(rows, columnar):
+        parsed = _zoho_row(row, cells, rules)
+        if parsed is None:
+            skipped = stats["zoho_skipped_rows"]
+            reason = _skip_reason(row)
+            skipped[reason] = skipped.get(reason, 0) + 1
+            continue
+        inv_id, meta, item = parsed
+        stats["zoho_line_rows"] += 1
+
+        if inv_id != cur_id:
+            if cur_meta is not None:
+                done_ids.add(cur_id)
+                stats["zoho_invoice_count"] += 1
+                yield _zoho_invoice(cur_meta, cur_items)
+            if inv_id in done_ids:
+                raise ValueError(
+                    f"Zoho export is not grouped by Invoice ID (saw {inv_id!r} again); "
+                    "parse it with presorted=False"
+                )
+            # store invoice-level fields once (first row wins; totals/dates are repeated anyway)
+            cur_id, cur_meta, cur_items = inv_id, meta, []
+        if item is not None:
+            cur_items.append(item)
+
+    if cur_meta is not None:
+        stats["zoho_invoice_count"] += 1
+        yield _zoho_invoice(cur_meta, cur_items)
+
+
+def parse_zoho(
+    zoho_csv_path: str,
+    presorted: Optional[bool] = None,
+    columnar: bool = False,
+    rules: ZohoRules = ZOHO_RULES,
+) -> Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]:
+    """
+    Collects iter_zoho_invoices() into {invoice_id: CanonicalInvoice}.
+
+    presorted=None streams the file as-is and falls back to the external sort when
+    the export turns out not to be grouped by Invoice ID.
+    """
+    report: Dict[str, Any] = {}
+    with stage("parse.zoho") as st:
+        try:
+            invoices = {
+                inv.external_id: inv
+                for inv in iter_zoho_invoices(
+                    zoho_csv_path, report, presorted=presorted is not False, columnar=columnar, rules=rules
+                )
+            }
+        except ValueError:
+            if presorted:
+                raise
+            invoices = {
+                inv.external_id: inv
+                for inv in iter_zoho_invoices(zoho_csv_path, report, presorted=False, columnar=columnar, rules=rules)
+            }
+        st.rows += report["zoho_line_rows"]
     return invoices, report
 
 
-def parse_eboekhouden(export_path: str) -> Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]:
-    # e-boekhouden export is a text file with a preamble; data starts at a header line.
-    lines = Path(export_path).read_text(encoding="utf-8-sig").splitlines()
-    header_idx = None
-    for i, l in enumerate(lines):
-        if l.strip().startswith("Datum") and "Nummer" in l and "Relatie" in l:
-            header_idx = i
+# Parallel parsing (parse_sources(workers > 1)): the Zoho file is cut into byte ranges that
+# each start at a CSV record boundary and at the first row of an invoice.
+ZOHO_MIN_CHUNK_BYTES = 4 * 1024 * 1024
+_QUOTE = ord('"')
+
+
+def _read_csv_record(f) -> bytes:
+    """Next CSV record (raw bytes, may span lines inside quotes) from a binary file at a record boundary."""
+    record = f.readline()
+    while record and record.count(_QUOTE) % 2:
+        line = f.readline()
+        if not line:
             break
-    if header_idx is None:
-        return {}, {"eboekhouden_invoice_count": 0, "error": "header_not_found"}
+        record += line
+    return record
+
+
+def _zoho_chunk_ranges(zoho_csv_path: str, chunks: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    (header, [(start, end), ...]): byte ranges covering every data row of the export.
 
-    header = lines[header_idx].split("\t")
+    A newline only ends a record when the number of quotes before it is even (quotes are
+    doubled inside quoted fields), so split points are moved to the next such newline,
+    then past the rows of the invoice that is cut there. Invoices never span two ranges
+    in a grouped export.
+    """
+    size = Path(zoho_csv_path).stat().st_size
+    with open(zoho_csv_path, "rb") as f:
+        f.seek(_zoho_format(zoho_csv_path).header_offset)
+        header_raw = _read_csv_record(f)
+        header = next(csv.reader(io.StringIO(header_raw.decode("utf-8-sig"), newline="")), [])
+        data_start = f.tell()
+        id_col = header.index("Invoice ID") if "Invoice ID" in header else None
+        chunks = max(1, min(chunks, (size - data_start) // ZOHO_MIN_CHUNK_BYTES))
+        if id_col is None or chunks == 1:
+            return header, [(data_start, size)]
+
+        def _record_id(raw: bytes) -> str:
+            rec = next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")), [])
+            return rec[id_col].strip() if len(rec) > id_col else ""
+
+        bounds = [data_start]
+        for k in range(1, chunks):
+            target = data_start + (size - data_start) * k // chunks
+            if target <= bounds[-1]:
+                continue
+            # bounds[-1] is a record boundary: count quotes from there to the end of the target's line,
+            # then read on to the first newline with an even count before it
+            f.seek(bounds[-1])
+            quotes = 0
+            while f.tell() < target:
+                quotes += f.read(min(1 << 24, target - f.tell())).count(_QUOTE)
+            line = f.readline()
+            quotes += line.count(_QUOTE)
+            while line and quotes % 2:
+                line = f.readline()
+                quotes += line.count(_QUOTE)
+            # then past the rows of the invoice that straddles it
+            boundary = size
+            record = _read_csv_record(f)
+            first_id = _record_id(record) if record else None
+            while record:
+                start = f.tell()
+                record = _read_csv_record(f)
+                if record and _record_id(record) != first_id:
+                    boundary = start
+                    break
+            if boundary >= size:
+                break
+            bounds.append(boundary)
+    return header, list(zip(bounds, bounds[1:] + [size]))
+
+
+def _parse_zoho_range(
+    zoho_csv_path: str, header: List[str], start: int, end: int, columnar: bool = False
+) -> Tuple[List[CanonicalInvoice], Dict[str, Any]]:
+    """Invoices of one _zoho_chunk_ranges() range (runs in a worker process)."""
+    with open(zoho_csv_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    stats = _zoho_stats()
+    with stage("parse.zoho") as st:
+        rows = csv.DictReader(io.StringIO(text, newline=""), fieldnames=header)
+        invoices = list(_group_zoho_rows(rows, stats, columnar))
+        st.rows = stats["zoho_line_rows"]
+    return invoices, stats
+
+
+def _merge_zoho_parts(
+    parts: Iterable[Tuple[List[CanonicalInvoice], Dict[str, Any]]]
+) -> Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]:
     invoices: Dict[str, CanonicalInvoice] = {}
+    report = _zoho_stats()
+    for part, stats in parts:
+        for inv in part:
+            if inv.external_id in invoices:
+                raise ValueError(f"Zoho export is not grouped by Invoice ID (saw {inv.external_id!r} in two chunks)")
+            invoices[inv.external_id] = inv
+        report["zoho_invoice_count"] += stats["zoho_invoice_count"]
+        report["zoho_line_rows"] += stats["zoho_line_rows"]
+        for reason, n in stats["zoho_skipped_rows"].items():
+            report["zoho_skipped_rows"][reason] = report["zoho_skipped_rows"].get(reason, 0) + n
+    return invoices, report
 
-    for l in lines[header_idx + 1 :]:
-        if not l.strip():
-            continue
-        parts = l.split("\t")
-        if len(parts) < 5:
-            continue
 
-        row = dict(zip(header, parts))
-        date_raw = row.get("Datum", "")
-        inv_date = parse_date_nl(date_raw)
-        if not inv_date:
-            continue
+EBOEKHOUDEN_IMPORT_NOTE = "Geïmporteerd uit e-boekhouden"
 
-        inv_no = normalize_invoice_number(row.get("Nummer", ""))
-        if not inv_no:
-            continue
+# The columns an e-boekhouden row is read from (with the value for a missing cell);
+# rows are looked up by position, the rest of the line is never decoded.
+EBOEKHOUDEN_COLUMNS = ("Datum", "Nummer", "Relatie", "Bedrag (Excl)", "Bedrag (Incl)", "Factuurtekst")
+_EBOEKHOUDEN_DEFAULTS = ("", "", "", "0", "0", "")
 
-        customer = normalize_customer_name(row.get("Relatie", ""))
-        amount_excl = _d2(parse_decimal_maybe_eu(row.get("Bedrag (Excl)", "0")))
-        amount_incl = _d2(parse_decimal_maybe_eu(row.get("Bedrag (Incl)", "0")))
+EboekhoudenFields = Tuple[str, str, str, str, str, str]
 
-        text = (row.get("Factuurtekst", "") or "").strip()
-        notes = text if text else "Geïmporteerd uit e-boekhouden"
 
-        if amount_incl < 0:
-            status = "cancelled"
-            outstanding = Decimal("0")
-        else:
-            # This export is historical; treat as paid unless you want otherwise
-            status = "paid"
-            outstanding = Decimal("0")
-
-        vat_amount = _d2(abs(amount_incl - amount_excl)) if amount_incl >= 0 else Decimal("0")
-        has_vat = vat_amount > 0
-
-        line_item = {
-            "description": (notes[:200] if text else "Dienstverlening"),
-            "quantity": 1,
-            "unit_price": float(abs(amount_excl)),
-            "has_vat": bool(has_vat),
-            "subtotal": float(abs(amount_excl)),
-            "vat_amount": float(vat_amount),
-            "total": float(abs(amount_incl)),
-        }
+def _eboekhouden_invoice(fields: EboekhoudenFields, skipped: Dict[str, int]) -> Optional[CanonicalInvoice]:
+    """
+    One e-boekhouden row (the EBOEKHOUDEN_COLUMNS cells) as an invoice; None for rows
+    that can't be imported, with the reason counted in `skipped`.
+    """
+    date_raw, number, relatie, excl, incl, text = fields
+    inv_date = cached_date_nl(date_raw)
+    if not inv_date:
+        skipped["bad_date"] = skipped.get("bad_date", 0) + 1
+        return None
 
-        invoices[inv_no] = CanonicalInvoice(
-            invoice_number=inv_no,
-            invoice_date=inv_date,
-            due_date=inv_date + timedelta(days=14),
-            customer_name=customer,
-            amount_incl=_d2(abs(amount_incl)),
-            outstanding_amount=_d2(outstanding),
-            status=status,
-            order_number=order_number_from_date(inv_date),
-            notes=notes,
-            line_items=[line_item],
-            external_id=inv_no,
-            external_system="eboekhouden",
-        )
+    inv_no = normalize_invoice_number(number)
+    if not inv_no:
+        skipped["missing_number"] = skipped.get("missing_number", 0) + 1
+        return None
+
+    customer = normalize_customer_name(relatie)
+    amount_excl = Money.parse(excl)
+    amount_incl = Money.parse(incl)
+
+    text = text.strip()
+    notes = text if text else EBOEKHOUDEN_IMPORT_NOTE
+
+    if amount_incl < 0:
+        status = "cancelled"
+        outstanding = ZERO
+    else:
+        # This export is historical; treat as paid unless you want otherwise
+        status = "paid"
+        outstanding = ZERO
+
+    vat_amount = Money(abs(amount_incl - amount_excl)) if amount_incl >= 0 else ZERO
+    has_vat = vat_amount > 0
+
+    line_item = LineItem(
+        description=(notes[:200] if text else "Dienstverlening"),
+        quantity=1,
+        unit_price=Money(abs(amount_excl)),
+        has_vat=bool(has_vat),
+        subtotal=Money(abs(amount_excl)),
+        vat_amount=vat_amount,
+        total=Money(abs(amount_incl)),
+    )
+
+    return CanonicalInvoice(
+        invoice_number=inv_no,
+        invoice_date=inv_date,
+        due_date=inv_date + timedelta(days=14),
+        customer_name=customer,
+        amount_incl=Money(abs(amount_incl)),
+        outstanding_amount=outstanding,
+        status=status,
+        order_number=order_number_from_date(inv_date),
+        notes=notes,
+        line_items=[line_item],
+        external_id=inv_no,
+        external_system="eboekhouden",
+    )
+
+
+# Either e-boekhouden export: the tab separated one with a report preamble above the
+# header, or the semicolon CSV. export_format.py finds the header in the first KBs.
+EBOEKHOUDEN_SOURCES = ("eboekhouden", "eboekhouden_semicolon")
 
-    report = {"eboekhouden_invoice_count": len(invoices)}
+
+def _eboekhouden_format(export_path: str) -> Optional[ExportFormat]:
+    try:
+        fmt = sniff_export(export_path)
+    except ValueError:
+        return None
+    return fmt if fmt.source in EBOEKHOUDEN_SOURCES else None
+
+
+def _eboekhouden_positions(header: Sequence[str]) -> List[Optional[int]]:
+    names = [h.strip() for h in header]
+    return [names.index(c) if c in names else None for c in EBOEKHOUDEN_COLUMNS]
+
+
+def _eboekhouden_tab_rows(export_path: str, fmt: ExportFormat, skipped: Dict[str, int]) -> Iterator[EboekhoudenFields]:
+    """
+    Cells of the tab export's data rows. Lines come lazily out of an mmap of the file
+    (from the header on; Factuurtekst isn't quoted, so a line is a row) and only the
+    EBOEKHOUDEN_COLUMNS cells are decoded: no decoded copy of the file, no list of lines.
+    """
+    encoding = "utf-8" if fmt.encoding == "utf-8-sig" else fmt.encoding
+    with open(export_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= fmt.header_offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mm.seek(fmt.header_offset)
+            lines = iter(mm.readline, b"")
+            header = next(lines, b"").rstrip(b"\r\n").decode(encoding).split("\t")
+            cols = list(zip(_eboekhouden_positions(header), _EBOEKHOUDEN_DEFAULTS))
+            for line in lines:
+                if not line.strip():
+                    continue
+                parts = line.rstrip(b"\r\n").split(b"\t")
+                n = len(parts)
+                if n < 5:
+                    skipped["short_row"] = skipped.get("short_row", 0) + 1
+                    continue
+                yield tuple(parts[i].decode(encoding) if i is not None and i < n else d for i, d in cols)
+
+
+def _eboekhouden_csv_rows(export_path: str, fmt: ExportFormat) -> Iterator[EboekhoudenFields]:
+    """Cells of the semicolon (or other delimited, quoted) CSV's data rows."""
+    with open_export(export_path, fmt) as f:
+        reader = csv.reader(f, delimiter=fmt.delimiter)
+        cols = list(zip(_eboekhouden_positions(next(reader, [])), _EBOEKHOUDEN_DEFAULTS))
+        for row in reader:
+            n = len(row)
+            yield tuple(row[i] if i is not None and i < n else d for i, d in cols)
+
+
+def _eboekhouden_export_invoices(export_path: str, fmt: ExportFormat, skipped: Dict[str, int]) -> Iterator[CanonicalInvoice]:
+    if fmt.delimiter == "\t":
+        rows = _eboekhouden_tab_rows(export_path, fmt, skipped)
+    else:
+        rows = _eboekhouden_csv_rows(export_path, fmt)
+    for fields in rows:
+        inv = _eboekhouden_invoice(fields, skipped)
+        if inv is not None:
+            yield inv
+
+
+def iter_eboekhouden_invoices(export_path: str, stats: Optional[Dict[str, Any]] = None) -> Iterator[CanonicalInvoice]:
+    """
+    Streams CanonicalInvoice objects from an e-boekhouden export (either layout). `stats`
+    (optional) is filled with eboekhouden_invoice_count (rows yielded; a number that comes
+    back replaces the earlier one in parse_eboekhouden) and eboekhouden_skipped_rows, plus
+    error=header_not_found for files without a header.
+    """
+    if stats is None:
+        stats = {}
+    skipped: Dict[str, int] = {}
+    stats.update({"eboekhouden_invoice_count": 0, "eboekhouden_skipped_rows": skipped})
+    fmt = _eboekhouden_format(export_path)
+    if fmt is None:
+        stats["error"] = "header_not_found"
+        return
+    for inv in _eboekhouden_export_invoices(export_path, fmt, skipped):
+        stats["eboekhouden_invoice_count"] += 1
+        yield inv
+
+
+def parse_eboekhouden(export_path: str) -> Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]:
+    fmt = _eboekhouden_format(export_path)
+    if fmt is None:
+        return {}, {"eboekhouden_invoice_count": 0, "error": "header_not_found"}
+
+    invoices: Dict[str, CanonicalInvoice] = {}
+    skipped: Dict[str, int] = {}
+    # Read straight from the header line on, without loading the file first
+    with stage("parse.eboekhouden") as st:
+        for inv in _eboekhouden_export_invoices(export_path, fmt, skipped):
+            invoices[inv.external_id] = inv
+            st.rows += 1
+        st.rows += sum(skipped.values())
+
+    report = {"eboekhouden_invoice_count": len(invoices), "eboekhouden_skipped_rows": skipped}
     return invoices, report
 
 
+def set_customer_aliases(aliases: AliasStore) -> None:
+    """Alias store normalize_customer_name() resolves with (what --aliases PATH does)."""
+    global CUSTOMER_ALIASES
+    CUSTOMER_ALIASES = aliases
+
+
+def _init_parse_worker(aliases: AliasStore) -> None:
+    # Worker processes may be spawned (macOS/Windows): hand them main()'s --aliases store
+    set_customer_aliases(aliases)
+
+
+def _profiled(fn: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, Any]]:
+    """fn(*args) in a parse worker, plus the stages/counters it recorded there (merged by the parent)."""
+    PROFILER.reset()
+    return fn(*args), PROFILER.report()
+
+
+def _profiled_result(future: Any) -> Any:
+    result, report = future.result()
+    PROFILER.merge(report)
+    return result
+
+
+ParseResult = Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]
+
+
+def parse_sources(
+    zoho_csv_path: str,
+    eboekhouden_path: str,
+    presorted: Optional[bool] = None,
+    columnar: bool = False,
+    workers: int = 1,
+) -> Tuple[ParseResult, ParseResult]:
+    """
+    (parse_zoho(), parse_eboekhouden()) results.
+
+    With workers > 1 both run in one process pool: e-boekhouden as a single task, the
+    Zoho export split into byte ranges parsed concurrently (see _zoho_chunk_ranges) and
+    merged in file order, so the result is the same as the serial parse. An export that
+    turns out not to be grouped by Invoice ID falls back to the external sort.
+    """
+    if workers <= 1:
+        return parse_zoho(zoho_csv_path, presorted=presorted, columnar=columnar), parse_eboekhouden(eboekhouden_path)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(CUSTOMER_ALIASES,)) as pool:
+        # Stage timings are recorded in the workers and merged back (--profile shows parse.*)
+        eboek = pool.submit(_profiled, parse_eboekhouden, eboekhouden_path)
+        zoho: Optional[ParseResult] = None
+        # The byte-range split assumes a comma separated utf-8 file (what Zoho exports)
+        fmt = _zoho_format(zoho_csv_path)
+        if presorted is not False and fmt.delimiter == "," and fmt.encoding != "cp1252":
+            header, ranges = _zoho_chunk_ranges(zoho_csv_path, workers)
+            parts = [
+                pool.submit(_profiled, _parse_zoho_range, zoho_csv_path, header, start, end, columnar)
+                for start, end in ranges
+            ]
+            try:
+                zoho = _merge_zoho_parts(_profiled_result(p) for p in parts)
+            except ValueError:
+                if presorted:
+                    raise
+                presorted = False  # not grouped: external sort
+        if zoho is None:
+            zoho = _profiled_result(pool.submit(_profiled, parse_zoho, zoho_csv_path, presorted, columnar))
+        return zoho, _profiled_result(eboek)
+
+
+# Record linkage between the two exports (merge_dedupe). Every e-boekhouden invoice is
+# looked up with each strategy in turn; the first Zoho invoice found is its duplicate.
+# A Zoho invoice is linked at most once.
+@dataclass(frozen=True)
+class LinkStrategy:
+    name: str
+    # Hash key; None = the invoice can't be linked this way
+    key: Callable[[CanonicalInvoice], Any]
+    # > 0: same key and invoice dates at most this many days apart (closest date wins)
+    window_days: int = 0
+
+
+def _number_key(inv: CanonicalInvoice) -> Optional[str]:
+    return normalize_invoice_number(inv.invoice_number) or None
+
+
+def _customer_date_amount_key(inv: CanonicalInvoice) -> Optional[Tuple[str, int, int]]:
+    customer = customer_match_key(inv.customer_name)
+    return (customer, inv.invoice_date.toordinal(), int(inv.amount_incl)) if customer else None
+
+
+def _amount_key(inv: CanonicalInvoice) -> Optional[int]:
+    # Zero amounts say nothing
+    return int(inv.amount_incl) or None
+
+
+DEFAULT_DATE_WINDOW_DAYS = 3
+
+LINK_STRATEGIES: Dict[str, LinkStrategy] = {
+    "number": LinkStrategy("number", _number_key),
+    "customer_date_amount": LinkStrategy("customer_date_amount", _customer_date_amount_key),
+    "amount_date_window": LinkStrategy("amount_date_window", _amount_key, DEFAULT_DATE_WINDOW_DAYS),
+}
+DEFAULT_LINK_STRATEGIES = ("number",)
+
+
+class _LinkIndex:
+    """Hash index of Zoho invoices for one strategy; per key sorted by date when windowed."""
+
+    def __init__(self, strategy: LinkStrategy, invoices: Iterable[CanonicalInvoice]):
+        self.strategy = strategy
+        self.by_key: Dict[Any, List[CanonicalInvoice]] = defaultdict(list)
+        for inv in invoices:
+            k = strategy.key(inv)
+            if k is not None:
+                self.by_key[k].append(inv)
+        self.ordinals: Dict[Any, List[int]] = {}
+        if strategy.window_days:
+            for k, invs in self.by_key.items():
+                invs.sort(key=lambda x: x.invoice_date)
+                self.ordinals[k] = [x.invoice_date.toordinal() for x in invs]
+
+    def lookup(self, inv: CanonicalInvoice, linked: Set[int]) -> Optional[CanonicalInvoice]:
+        """Best not-yet-linked Zoho invoice for `inv` (`linked` holds id()s of linked invoices)."""
+        k = self.strategy.key(inv)
+        candidates = self.by_key.get(k) if k is not None else None
+        if not candidates:
+            return None
+        if not self.strategy.window_days:
+            return next((c for c in candidates if id(c) not in linked), None)
+        ordinals = self.ordinals[k]
+        day = inv.invoice_date.toordinal()
+        lo = bisect_left(ordinals, day - self.strategy.window_days)
+        hi = bisect_right(ordinals, day + self.strategy.window_days)
+        best = None
+        for i in range(lo, hi):
+            if id(candidates[i]) not in linked and (best is None or abs(ordinals[i] - day) < abs(ordinals[best] - day)):
+                best = i
+        return candidates[best] if best is not None else None
+
+
+OVERLAP_COLUMNS = [
+    "kind",  # overlap | zoho_duplicate_number | renamed
+    "strategy",
+    "used",
+    "conflicts",  # amount / customer / date differences of an overlap, "|"-separated
+    "zoho_invoice_number",
+    "zoho_external_id",
+    "zoho_customer",
+    "zoho_date",
+    "zoho_total",
+    "eboekhouden_invoice_number",
+    "eboekhouden_customer",
+    "eboekhouden_date",
+    "eboekhouden_total",
+    "note",
+]
+
+
+def _overlap_cells(prefix: str, inv: Optional[CanonicalInvoice]) -> Dict[str, Any]:
+    if inv is None:
+        return {}
+    cells = {
+        f"{prefix}_invoice_number": inv.invoice_number,
+        f"{prefix}_customer": inv.customer_name,
+        f"{prefix}_date": inv.invoice_date.strftime("%Y-%m-%d"),
+        f"{prefix}_total": inv.amount_incl.euros(),
+    }
+    if prefix == "zoho":
+        cells["zoho_external_id"] = inv.external_id
+    return cells
+
+
+def _link_conflicts(zinv: CanonicalInvoice, einv: CanonicalInvoice) -> List[str]:
+    out = []
+    if abs(zinv.amount_incl - einv.amount_incl) > 1:
+        out.append("amount")
+    if customer_match_key(zinv.customer_name) != customer_match_key(einv.customer_name):
+        out.append("customer")
+    if zinv.invoice_date != einv.invoice_date:
+        out.append("date")
+    return out
+
+
 def merge_dedupe(
     zoho_invoices_by_id: Dict[str, CanonicalInvoice],
     eboek_invoices_by_number: Dict[str, CanonicalInvoice],
+    strategies: Optional[Sequence[str]] = None,
+    date_window_days: Optional[int] = None,
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Tuple[List[CanonicalInvoice], Dict[str, Any]]:
-    # Group Zoho by invoice_number (should be unique but keep safe)
-    zoho_by_number: Dict[str, List[CanonicalInvoice]] = defaultdict(list)
-    for inv in zoho_invoices_by_id.values():
-        zoho_by_number[normalize_invoice_number(inv.invoice_number)].append(inv)
+    """
+    Merges both exports into one list of invoices, sorted by (date, number).
 
-    conflicts_same_number_multiple_zoho = {k: len(v) for k, v in zoho_by_number.items() if len(v) > 1}
+    e-boekhouden invoices are linked to their Zoho duplicate with `strategies` (names in
+    LINK_STRATEGIES, tried in order; default: invoice number only). For a linked pair the
+    Zoho invoice is kept unless INVOICE_SOURCE_OVERRIDES says otherwise. Every index is a
+    hash map (windowed strategies bisect a per-key date list), so linking stays linear.
 
-    # Choose Zoho for overlaps on invoice_number; otherwise take whichever exists.
-    merged: Dict[Tuple[str, str], CanonicalInvoice] = {}  # (customer_name, invoice_number) -> invoice
-    overlap_report: List[Dict[str, Any]] = []
-    overlap_conflicts: List[Dict[str, Any]] = []
-    renamed_due_to_customer_dupe: List[Dict[str, Any]] = []
+    Every overlap, dropped duplicate Zoho number and renamed invoice is passed to
+    `on_record` (a dict with OVERLAP_COLUMNS keys) as it's found; the report only holds counts.
+    """
+    names = list(strategies or DEFAULT_LINK_STRATEGIES)
+    unknown = [n for n in names if n not in LINK_STRATEGIES]
+    if unknown:
+        raise ValueError(f"unknown link strategies: {', '.join(unknown)}")
+    chosen_strategies = [
+        replace(LINK_STRATEGIES[n], window_days=date_window_days)
+        if date_window_days is not None and LINK_STRATEGIES[n].window_days
+        else LINK_STRATEGIES[n]
+        for n in names
+    ]
+
+    def _record(kind: str, zinv=None, einv=None, **cells: Any) -> None:
+        if on_record:
+            on_record({"kind": kind, **_overlap_cells("zoho", zinv), **_overlap_cells("eboekhouden", einv), **cells})
 
     def _key(inv: CanonicalInvoice) -> Tuple[str, str]:
         return (inv.customer_name.lower().strip(), inv.invoice_number.strip())
 
-    # First: take Zoho invoices (preferred)
-    for inv_no, invs in zoho_by_number.items():
-        chosen = invs[0]
-        merged[_key(chosen)] = chosen
-
-    # Then: add e-boekhouden invoices that aren't already present by invoice_number
-    zoho_numbers = set(zoho_by_number.keys())
-    for inv_no, einv in eboek_invoices_by_number.items():
-        if inv_no in zoho_numbers:
-            # record overlap info (and potential discrepancy)
-            zinv = zoho_by_number[inv_no][0]
-            ztot = _d2(zinv.amount_incl)
-            etot = _d2(einv.amount_incl)
-            override = INVOICE_SOURCE_OVERRIDES.get(inv_no)
-            overlap_report.append(
-                {
-                    "invoice_number": inv_no,
-                    "used": override or "zoho_books",
-                    "zoho": {
-                        "customer": zinv.customer_name,
-                        "date": zinv.invoice_date.strftime("%Y-%m-%d"),
-                        "total": float(ztot),
-                    },
-                    "eboekhouden": {
-                        "customer": einv.customer_name,
-                        "date": einv.invoice_date.strftime("%Y-%m-%d"),
-                        "total": float(etot),
-                    },
-                }
-            )
-            if abs(ztot - etot) > Decimal("0.01"):
-                overlap_conflicts.append(
-                    {
-                        "invoice_number": inv_no,
-                        "zoho_total": float(ztot),
-                        "eboekhouden_total": float(etot),
-                        "override": override,
-                    }
-                )
-
-            # Apply override (if any)
-            if override == "eboekhouden":
-                # Replace the Zoho version in the merged set with e-boekhouden (same customer+number).
-                merged[_key(zinv)] = einv
+    # Zoho first (preferred); one invoice per invoice_number (should be unique but keep safe)
+    merged: Dict[Tuple[str, str], CanonicalInvoice] = {}  # (customer_name, invoice_number) -> invoice
+    zoho_numbers: Dict[str, int] = defaultdict(int)
+    zoho_kept: List[CanonicalInvoice] = []
+    for inv in zoho_invoices_by_id.values():
+        inv_no = normalize_invoice_number(inv.invoice_number)
+        zoho_numbers[inv_no] += 1
+        if zoho_numbers[inv_no] > 1:
+            _record("zoho_duplicate_number", inv, note="same invoice_number as an earlier Zoho invoice; not imported")
             continue
+        zoho_kept.append(inv)
+        merged[_key(inv)] = inv
+    conflicts_same_number_multiple_zoho = {k: n for k, n in zoho_numbers.items() if n > 1}
+    del zoho_numbers
+
+    with stage("merge.index") as st:
+        indexes = [_LinkIndex(strategy, zoho_kept) for strategy in chosen_strategies]
+        st.rows = len(zoho_kept)
+    linked: Set[int] = set()
+    overlaps_by_strategy: Dict[str, int] = {st.name: 0 for st in chosen_strategies}
+    amount_conflicts = renamed = 0
+
+    with stage("merge.link") as st:
+        for inv_no, einv in eboek_invoices_by_number.items():
+            for index in indexes:
+                zinv = index.lookup(einv, linked)
+                if zinv is not None:
+                    break
+            if zinv is not None:
+                linked.add(id(zinv))
+                overlaps_by_strategy[index.strategy.name] += 1
+                override = INVOICE_SOURCE_OVERRIDES.get(inv_no)
+                conflicts = _link_conflicts(zinv, einv)
+                amount_conflicts += "amount" in conflicts
+                _record(
+                    "overlap", zinv, einv,
+                    strategy=index.strategy.name,
+                    used=override or "zoho_books",
+                    conflicts="|".join(conflicts),
+                )
+                if override == "eboekhouden":
+                    # Replace the Zoho version in the merged set with e-boekhouden (same customer+number).
+                    merged[_key(zinv)] = einv
+                continue
 
-        k = _key(einv)
-        if k not in merged:
-            merged[k] = einv
-            continue
+            k = _key(einv)
+            if k not in merged:
+                merged[k] = einv
+                continue
 
-        # Same customer + same invoice_number already present (rare). Disambiguate by appending date.
-        new_no = f"{einv.invoice_number}-{einv.invoice_date.strftime('%Y%m%d')}"
-        renamed_due_to_customer_dupe.append(
-            {
-                "original_invoice_number": einv.invoice_number,
-                "new_invoice_number": new_no,
-                "customer": einv.customer_name,
-                "reason": "duplicate (customer_name, invoice_number) in merged set",
-                "source": einv.external_system,
-            }
-        )
-        einv.invoice_number = new_no
-        merged[_key(einv)] = einv
+            # Same customer + same invoice_number already present (rare). Disambiguate by appending date.
+            renamed_inv = replace(einv, invoice_number=f"{einv.invoice_number}-{einv.invoice_date.strftime('%Y%m%d')}")
+            renamed += 1
+            _record(
+                "renamed", None, renamed_inv,
+                note=f"duplicate (customer_name, invoice_number) in merged set; was {einv.invoice_number}",
+            )
+            merged[_key(renamed_inv)] = renamed_inv
+        st.rows = len(eboek_invoices_by_number)
 
-    merged_list = list(merged.values())
-    merged_list.sort(key=lambda x: (x.invoice_date, x.invoice_number))
+    with stage("merge.sort") as st:
+        merged_list = list(merged.values())
+        merged_list.sort(key=lambda x: (x.invoice_date, x.invoice_number))
+        st.rows = len(merged_list)
 
     report = {
         "merged_invoice_count": len(merged_list),
         "zoho_invoice_count": len(zoho_invoices_by_id),
         "eboekhouden_invoice_count": len(eboek_invoices_by_number),
-        "overlap_invoice_numbers": len(overlap_report),
-        "overlap_details": overlap_report[:200],  # cap in report file size
-        "overlap_conflicts_count": len(overlap_conflicts),
-        "overlap_conflicts": overlap_conflicts,
+        "link_strategies": [st.name for st in chosen_strategies],
+        "overlap_invoice_numbers": sum(overlaps_by_strategy.values()),
+        "overlaps_by_strategy": overlaps_by_strategy,
+        "overlap_conflicts_count": amount_conflicts,
         "conflicts_multiple_zoho_same_number": conflicts_same_number_multiple_zoho,
-        "renamed_due_to_customer_dupe": renamed_due_to_customer_dupe,
+        "renamed_due_to_customer_dupe_count": renamed,
     }
     return merged_list, report
 
 
-def generate_sql(invoices: List[CanonicalInvoice]) -> str:
-    total_amount = _d2(sum((inv.amount_incl for inv in invoices), Decimal("0")))
-
-    values_lines: List[str] = []
-    for inv in invoices:
-        due = inv.due_date.strftime("%Y-%m-%d") if inv.due_date else None
-        values_lines.append(
-            "("
-            + ", ".join(
-                [
-                    sql_quote(inv.invoice_number),
-                    sql_quote(inv.invoice_date.strftime("%Y-%m-%d")) + "::date",
-                    (sql_quote(due) + "::date") if due else "NULL",
-                    sql_quote(inv.customer_name),
-                    str(float(_d2(inv.amount_incl))),
-                    str(float(_d2(inv.outstanding_amount))),
-                    sql_quote(inv.status),
-                    sql_quote(inv.order_number),
-                    sql_quote(inv.notes),
-                    jsonb_literal(inv.line_items),
-                    sql_quote(inv.external_id or inv.invoice_number),
-                    sql_quote(inv.external_system),
-                ]
-            )
-            + ")"
-        )
-
-    values_block = ",\n    ".join(values_lines)
-
-    sql = f"""-- =====================================================
--- IMPORT ALL INVOICES (DEDUPED) FROM ZOHO + E-BOEKHOUDEN EXPORTS
--- - Zoho chosen when the same invoice_number exists in both sources
--- - Customer aliases applied (see convert_all_invoices_to_sql.py)
--- =====================================================
--- Total invoices: {len(invoices)}
--- Total amount (incl): €{total_amount}
-
-BEGIN;
-
-WITH invoice_data AS (
-  SELECT * FROM (
-    VALUES
-    {values_block}
-  ) AS t(
-    invoice_number,
-    invoice_date,
-    due_date,
-    customer_name,
-    amount,
-    outstanding_amount,
-    status,
-    order_number,
-    notes,
-    line_items,
-    external_id,
-    external_system
-  )
-),
-customer_mapping AS (
-  SELECT DISTINCT
-    id.customer_name,
+@contextmanager
+def overlap_table(path: Path) -> Iterator[Callable[[Dict[str, Any]], None]]:
+    """merge_dedupe(on_record=...) callback that streams the records to a CSV table."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, OVERLAP_COLUMNS)
+        writer.writeheader()
+        yield writer.writerow
+
+
+# Column order shared by the VALUES literal, the COPY staging table and the DB loader.
+INVOICE_COLUMNS: List[Tuple[str, str]] = [
+    ("invoice_number", "text"),
+    ("invoice_date", "date"),
+    ("due_date", "date"),
+    ("customer_name", "text"),
+    ("amount", "numeric"),
+    ("outstanding_amount", "numeric"),
+    ("status", "text"),
+    ("order_number", "text"),
+    ("notes", "text"),
+    ("line_items", "jsonb"),
+    ("external_id", "text"),
+    ("external_system", "text"),
+]
+
+STAGING_TABLE = "invoice_import_staging"
+
+# After the invoice_data CTE: resolve customer_name -> customer_id in SQL (creating missing customers).
+CUSTOMER_MAPPING_SQL = """customer_mapping AS (
+  -- Index lookup on customers.company_name_key / name_key (migration 20260301000000_customer_match_keys.sql)
+  SELECT DISTINCT ON (k.customer_name)
+    k.customer_name,
+    k.customer_key,
     c.id AS customer_id
-  FROM invoice_data id
+  FROM (
+    SELECT DISTINCT
+      customer_name,
+      public.customer_match_key(customer_name) AS customer_key
+    FROM invoice_data
+  ) k
   LEFT JOIN public.customers c
-    ON lower(c.company_name) = lower(id.customer_name)
-    OR lower(c.name) = lower(id.customer_name)
+    ON c.company_name_key = k.customer_key
+    OR c.name_key = k.customer_key
+  ORDER BY k.customer_name, (c.company_name_key = k.customer_key) DESC NULLS LAST, c.created_at
 ),
+-- Create missing customers
 new_customers AS (
   INSERT INTO public.customers (
     name,
@@ -503,7 +1414,7 @@ new_customers AS (
     created_at,
     updated_at
   )
-  SELECT DISTINCT
+  SELECT DISTINCT ON (cm.customer_key)
     cm.customer_name AS name,
     cm.customer_name AS company_name,
     'active' AS status,
@@ -512,27 +1423,18 @@ new_customers AS (
     NOW() AS updated_at
   FROM customer_mapping cm
   WHERE cm.customer_id IS NULL
-    AND NOT EXISTS (
-      SELECT 1 FROM public.customers c
-      WHERE lower(c.company_name) = lower(cm.customer_name)
-         OR lower(c.name) = lower(cm.customer_name)
-    )
-  RETURNING id, company_name
+    AND cm.customer_key IS NOT NULL
+  ORDER BY cm.customer_key, cm.customer_name
+  RETURNING id, company_name_key
 ),
+-- Update customer_mapping with newly created customers
 updated_customer_mapping AS (
-  SELECT DISTINCT
+  SELECT
     cm.customer_name,
-    COALESCE(
-      cm.customer_id,
-      nc.id,
-      (SELECT id FROM public.customers
-       WHERE lower(company_name) = lower(cm.customer_name)
-          OR lower(name) = lower(cm.customer_name)
-       LIMIT 1)
-    ) AS customer_id
+    COALESCE(cm.customer_id, nc.id) AS customer_id
   FROM customer_mapping cm
   LEFT JOIN new_customers nc
-    ON lower(nc.company_name) = lower(cm.customer_name)
+    ON nc.company_name_key = cm.customer_key
 ),
 final_data AS (
   SELECT
@@ -552,7 +1454,10 @@ final_data AS (
   LEFT JOIN updated_customer_mapping ucm ON id.customer_name = ucm.customer_name
   WHERE ucm.customer_id IS NOT NULL
 ),
-updated AS (
+"""
+
+# Upsert shared by both paths; expects a final_data CTE with a resolved customer_id.
+WRITE_SQL = """updated AS (
   UPDATE public.customer_invoices ci
   SET
     invoice_date = fd.invoice_date,
@@ -609,42 +1514,617 @@ WHERE NOT EXISTS (
   WHERE u.customer_id = fd.customer_id
     AND u.invoice_number = fd.invoice_number
 );
+"""
+
+# Everything after the invoice_data CTE: customer mapping + set-based upsert.
+UPSERT_SQL = CUSTOMER_MAPPING_SQL + WRITE_SQL
 
+# Same upsert when invoice_data already carries customer_id (resolved client-side, see customer_snapshot.py).
+DIRECT_UPSERT_SQL = """final_data AS (
+  SELECT
+    customer_id,
+    invoice_number,
+    invoice_date,
+    due_date,
+    order_number,
+    amount,
+    outstanding_amount,
+    status,
+    external_id,
+    external_system,
+    notes,
+    line_items
+  FROM invoice_data
+),
+""" + WRITE_SQL
+
+
+def unmatched_customer_invoices(invoices: Sequence[CanonicalInvoice]) -> List[CanonicalInvoice]:
+    """
+    Invoices whose customer name has no letters or digits: customer_match_key() is NULL for
+    them, so the upsert can't find or create their customer and skips them.
+    """
+    keyless = {name for name in {inv.customer_name for inv in invoices} if customer_match_key(name) is None}
+    return [inv for inv in invoices if inv.customer_name in keyless] if keyless else []
+
+
+def unmatched_customer_note(invoices: Sequence[CanonicalInvoice]) -> str:
+    """SQL header line counting the invoices the upsert skips (unmatched_customer_invoices()); '' if none."""
+    skipped = len(unmatched_customer_invoices(invoices))
+    if not skipped:
+        return ""
+    return f"-- Skipped (customer name without letters or digits, no customer to link): {skipped}\n"
+
+
+def _sql_header(invoices: List[CanonicalInvoice], extra: str = "") -> str:
+    total_amount = Money(sum(inv.amount_incl for inv in invoices))
+    return f"""-- =====================================================
+-- IMPORT ALL INVOICES (DEDUPED) FROM ZOHO + E-BOEKHOUDEN EXPORTS
+-- - Zoho chosen when the same invoice_number exists in both sources
+-- - Customer aliases applied (see convert_all_invoices_to_sql.py)
+-- - Requires migration 20260301000000_customer_match_keys.sql
+{extra}-- =====================================================
+-- Total invoices: {len(invoices)}
+-- Total amount (incl): €{total_amount}
+{unmatched_customer_note(invoices)}"""
+
+
+def _row_values(inv: CanonicalInvoice, customer_id: Optional[str] = None) -> List[Any]:
+    """Python values for one invoice, in INVOICE_COLUMNS order (None = NULL), customer_id first if given."""
+    values = [] if customer_id is None else [customer_id]
+    return values + [
+        inv.invoice_number,
+        inv.invoice_date.strftime("%Y-%m-%d"),
+        inv.due_date.strftime("%Y-%m-%d") if inv.due_date else None,
+        inv.customer_name,
+        inv.amount_incl.sql(),
+        inv.outstanding_amount.sql(),
+        inv.status,
+        inv.order_number,
+        inv.notes,
+        line_items_json(inv.line_items),
+        inv.external_id or inv.invoice_number,
+        inv.external_system,
+    ]
+
+
+def _copy_text_field(v: Optional[str]) -> str:
+    if v is None:
+        return "\\N"
+    return v.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_csv_field(v: Optional[str]) -> str:
+    # Quote every non-NULL value so empty strings stay distinct from NULL (unquoted empty).
+    if v is None:
+        return ""
+    return '"' + v.replace('"', '""') + '"'
+
+
+def copy_row(inv: CanonicalInvoice, copy_format: str = "text", customer_id: Optional[str] = None) -> str:
+    """One COPY data line (with trailing newline) for `inv`."""
+    values = _row_values(inv, customer_id)
+    if copy_format == "csv":
+        return ",".join(_copy_csv_field(v) for v in values) + "\n"
+    return "\t".join(_copy_text_field(v) for v in values) + "\n"
+
+
+def values_row(inv: CanonicalInvoice, customer_id: Optional[str] = None) -> str:
+    due = inv.due_date.strftime("%Y-%m-%d") if inv.due_date else None
+    return (
+        "("
+        + ("" if customer_id is None else sql_quote(customer_id) + "::uuid, ")
+        + ", ".join(
+            [
+                sql_quote(inv.invoice_number),
+                sql_quote(inv.invoice_date.strftime("%Y-%m-%d")) + "::date",
+                (sql_quote(due) + "::date") if due else "NULL",
+                sql_quote(inv.customer_name),
+                inv.amount_incl.sql(),
+                inv.outstanding_amount.sql(),
+                sql_quote(inv.status),
+                sql_quote(inv.order_number),
+                sql_quote(inv.notes),
+                "$$" + line_items_json(inv.line_items) + "$$::jsonb",
+                sql_quote(inv.external_id or inv.invoice_number),
+                sql_quote(inv.external_system),
+            ]
+        )
+        + ")"
+    )
+
+
+def _batch_comment(i: int, n: int, batch: List[Any]) -> str:
+    if n <= 1:
+        return ""
+    return f"-- Batch {i}/{n} ({len(batch)} invoices; independent + idempotent, safe to re-run on its own)\n"
+
+
+def _columns(direct: bool) -> List[Tuple[str, str]]:
+    return ([("customer_id", "uuid")] if direct else []) + INVOICE_COLUMNS
+
+
+def _plan_batches(
+    invoices: List[CanonicalInvoice],
+    batch_size: Optional[int],
+    customer_ids: Optional[Dict[str, str]],
+) -> List[Tuple[List[CanonicalInvoice], bool]]:
+    """
+    Splits invoices into (batch, direct) pairs. With `customer_ids` (customer_name -> uuid,
+    resolved client-side) the resolved invoices become direct batches that skip the SQL
+    customer mapping; the rest still go through it.
+    """
+    if customer_ids is None:
+        return [(b, False) for b in chunked(invoices, batch_size)]
+    resolved = [inv for inv in invoices if inv.customer_name in customer_ids]
+    unresolved = [inv for inv in invoices if inv.customer_name not in customer_ids]
+    plan = [(b, True) for b in chunked(resolved, batch_size) if b]
+    plan += [(b, False) for b in chunked(unresolved, batch_size) if b]
+    return plan or [([], False)]
+
+
+def _invoice_rows(invoices: Sequence[Any], *args: Any, **kwargs: Any) -> int:
+    return len(invoices)
+
+
+COPY_HEADER_NOTE = "-- - Rows loaded via COPY FROM STDIN (run with: psql -f <file>)\n"
+
+
+def _sql_footer(invoices: Sequence[Any]) -> str:
+    return f"\n-- Imported/updated {len(invoices)} invoices\n"
+
+
+def _values_transaction(i: int, n: int, batch: List[CanonicalInvoice], direct: bool, ids: Dict[str, str]) -> str:
+    """Batch `i` of `n` as one VALUES upsert transaction ('' for an empty batch)."""
+    if not batch:
+        return ""
+    column_list = ",\n    ".join(name for name, _ in _columns(direct))
+    values_block = ",\n    ".join(values_row(inv, ids.get(inv.customer_name) if direct else None) for inv in batch)
+    return f"""
+{_batch_comment(i, n, batch)}BEGIN;
+
+WITH invoice_data AS (
+  SELECT * FROM (
+    VALUES
+    {values_block}
+  ) AS t(
+    {column_list}
+  )
+),
+{DIRECT_UPSERT_SQL if direct else UPSERT_SQL}
 COMMIT;
+"""
 
--- Imported/updated {len(invoices)} invoices
+
+def _copy_transaction(
+    i: int, n: int, batch: List[CanonicalInvoice], direct: bool, ids: Dict[str, str], copy_format: str = "text"
+) -> str:
+    """Batch `i` of `n` as one COPY-into-staging + upsert transaction ('' for an empty batch)."""
+    if not batch:
+        return ""
+    options = " WITH (FORMAT csv)" if copy_format == "csv" else ""
+    columns = ", ".join(name for name, _ in _columns(direct))
+    copy_block = "".join(copy_row(inv, copy_format, ids.get(inv.customer_name) if direct else None) for inv in batch)
+    return f"""
+{_batch_comment(i, n, batch)}BEGIN;
+
+{staging_table_sql(direct=direct)}
+COPY {STAGING_TABLE} ({columns}) FROM STDIN{options};
+{copy_block}\\.
+
+ANALYZE {STAGING_TABLE};
+
+WITH invoice_data AS (
+  SELECT * FROM {STAGING_TABLE}
+),
+{DIRECT_UPSERT_SQL if direct else UPSERT_SQL}
+COMMIT;
 """
-    return sql
 
 
-def main() -> int:
-    zoho_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ZOHO_CSV
-    eboek_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_EBOEKHOUDEN_EXPORT
+@timed("render.values", rows=_invoice_rows)
+def generate_sql(
+    invoices: List[CanonicalInvoice],
+    batch_size: Optional[int] = None,
+    customer_ids: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    One VALUES-based upsert transaction per batch of `batch_size` invoices
+    (default: a single transaction for everything).
+    Invoices whose customer is in `customer_ids` carry a concrete customer_id.
+    """
+    plan = _plan_batches(invoices, batch_size, customer_ids)
+    ids = customer_ids or {}
+
+    parts = [_sql_header(invoices)]
+    parts += [_values_transaction(i, len(plan), batch, direct, ids) for i, (batch, direct) in enumerate(plan, 1)]
+    parts.append(_sql_footer(invoices))
+    return "".join(parts)
+
+
+def staging_table_sql(table: str = STAGING_TABLE, direct: bool = False) -> str:
+    cols = ",\n  ".join(f"{name} {typ}" for name, typ in _columns(direct))
+    return f"CREATE TEMP TABLE {table} (\n  {cols}\n) ON COMMIT DROP;\n"
+
+
+@timed("render.copy", rows=_invoice_rows)
+def generate_copy_sql(
+    invoices: List[CanonicalInvoice],
+    copy_format: str = "text",
+    batch_size: Optional[int] = None,
+    customer_ids: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Same upsert as generate_sql(), but the rows are bulk-loaded with
+    COPY ... FROM STDIN into a temp staging table instead of one big VALUES literal.
+    Parsing/planning cost stays flat as the invoice count grows.
 
-    zoho_invoices, zoho_report = parse_zoho(zoho_path)
-    eboek_invoices, eboek_report = parse_eboekhouden(eboek_path)
+    COPY FROM STDIN needs a client that streams stdin (psql -f file.sql);
+    the Supabase SQL editor can't run it, use generate_sql() there.
+    """
+    if copy_format not in ("text", "csv"):
+        raise ValueError(f"unknown COPY format: {copy_format!r}")
+    plan = _plan_batches(invoices, batch_size, customer_ids)
+    ids = customer_ids or {}
+
+    parts = [_sql_header(invoices, COPY_HEADER_NOTE)]
+    parts += [
+        _copy_transaction(i, len(plan), batch, direct, ids, copy_format) for i, (batch, direct) in enumerate(plan, 1)
+    ]
+    parts.append(_sql_footer(invoices))
+    return "".join(parts)
+
+
+def batch_plan_digest(
+    plan: List[Tuple[List[CanonicalInvoice], bool]], customer_ids: Optional[Dict[str, str]] = None, **options: Any
+) -> str:
+    """import_checkpoint.plan_digest() of a _plan_batches() plan: which invoice (and customer_id) is in which batch."""
+    ids = customer_ids or {}
+    return plan_digest(
+        (
+            (
+                f"{inv.external_system}:{inv.external_id or inv.invoice_number}:{ids.get(inv.customer_name, '') if direct else ''}"
+                for inv in batch
+            )
+            for batch, direct in plan
+        ),
+        **options,
+    )
 
-    merged, merge_report = merge_dedupe(zoho_invoices, eboek_invoices)
 
-    sql = generate_sql(merged)
+def write_sql_file(
+    path: Path,
+    invoices: List[CanonicalInvoice],
+    plan: List[Tuple[List[CanonicalInvoice], bool]],
+    checkpoint: ImportCheckpoint,
+    copy_format: Optional[str] = None,
+    customer_ids: Optional[Dict[str, str]] = None,
+    trailer: str = "",
+) -> int:
+    """
+    Writes generate_sql() (copy_format None) / generate_copy_sql() output for `plan` batch by
+    batch, then `trailer`, saving `checkpoint` after every batch. Batches the checkpoint
+    already has are skipped and the file continues where the last one ended. Returns the file size.
+    """
+    ids = customer_ids or {}
+    with open_resumable(str(path), checkpoint) as f:
+        if not checkpoint.output_bytes:
+            with stage("render"):
+                header = _sql_header(invoices, COPY_HEADER_NOTE if copy_format else "")
+            with stage("write"):
+                f.write(header.encode("utf-8"))
+        for i, (batch, direct) in enumerate(plan, 1):
+            if checkpoint.is_done(i):
+                continue
+            with stage("render") as st:
+                if copy_format:
+                    text = _copy_transaction(i, len(plan), batch, direct, ids, copy_format)
+                else:
+                    text = _values_transaction(i, len(plan), batch, direct, ids)
+                st.rows += len(batch)
+            with stage("write"):
+                f.write(text.encode("utf-8"))
+                f.flush()
+            checkpoint.mark_batch(i, output_bytes=f.tell())
+        with stage("write") as st:
+            f.write((_sql_footer(invoices) + trailer).encode("utf-8"))
+            st.bytes = f.tell()
+        return st.bytes
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Merge + dedupe Zoho and e-boekhouden invoice exports into one SQL file.")
+    p.add_argument("zoho", nargs="?", default=DEFAULT_ZOHO_CSV, help="Zoho Books invoice export (CSV)")
+    p.add_argument("eboekhouden", nargs="?", default=DEFAULT_EBOEKHOUDEN_EXPORT, help="e-boekhouden invoice export")
+    p.add_argument(
+        "--zoho-unsorted",
+        action="store_true",
+        help="Zoho export is not grouped by Invoice ID: external-sort it on disk instead of streaming",
+    )
+    p.add_argument(
+        "--columnar",
+        action="store_true",
+        help="parse Zoho amounts/dates column-wise per block of rows (fast paths for plain numbers/ISO dates)",
+    )
+    p.add_argument(
+        "--parse-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="parse the exports in N processes (both sources concurrently, big Zoho files in chunks); 0 = one per CPU",
+    )
+    p.add_argument(
+        "--link",
+        default=",".join(DEFAULT_LINK_STRATEGIES),
+        metavar="STRATEGIES",
+        help="how e-boekhouden invoices are matched to their Zoho duplicate, tried in order: "
+        + ", ".join(LINK_STRATEGIES),
+    )
+    p.add_argument(
+        "--date-window",
+        type=int,
+        default=None,
+        metavar="DAYS",
+        help=f"max days between invoice dates for amount_date_window (default {DEFAULT_DATE_WINDOW_DAYS})",
+    )
+    p.add_argument(
+        "--aliases",
+        default=None,
+        metavar="PATH",
+        help="customer alias JSON file (default: customer_aliases.json next to this script)",
+    )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="keep the merged invoices in column arrays (InvoiceColumns) instead of one object per invoice; less memory on big exports",
+    )
+    p.add_argument(
+        "--format",
+        choices=("values", "copy", "copy-csv"),
+        default="values",
+        help="values: one VALUES CTE (Supabase SQL editor); copy/copy-csv: COPY FROM STDIN into a staging table (psql)",
+    )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        metavar="N",
+        help="split the output into independent transactions of N invoices (each re-runnable on its own)",
+    )
+    p.add_argument(
+        "--dsn",
+        default=None,
+        help="load straight into Postgres (COPY + server-side upsert) instead of writing the SQL file; needs psycopg[pool]",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="with --dsn: number of pooled connections loading batches concurrently",
+    )
+    p.add_argument(
+        "--customers",
+        default=None,
+        metavar="SNAPSHOT",
+        help="resolve customer_id client-side from a customers CSV dump or postgresql:// DSN (see customer_snapshot.py); SQL file only, not with --dsn",
+    )
+    p.add_argument(
+        "--manifest",
+        default=None,
+        metavar="PATH",
+        help="incremental import: only emit invoices that are new or changed since the run that wrote this manifest (see import_manifest.py)",
+    )
+    p.add_argument(
+        "--missing",
+        choices=("ignore", "cancel", "delete"),
+        default="ignore",
+        help="with --manifest: what to do with invoices that disappeared from the exports",
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue after the last completed batch of a run that died (SQL file or --dsn load; see import_checkpoint.py)",
+    )
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="print a per-stage timing/counter breakdown to stderr (always in the report's profile line)",
+    )
+    p.add_argument(
+        "--cprofile",
+        default=None,
+        metavar="PATH",
+        help="run under cProfile and dump pstats to PATH (python3 -m pstats PATH)",
+    )
+    args = p.parse_args(argv)
+    if args.missing != "ignore" and not args.manifest:
+        p.error("--missing needs --manifest")
+    if args.customers and args.dsn:
+        p.error("--customers only applies to the SQL file; with --dsn customers are resolved server-side")
+    args.link = [name.strip() for name in args.link.split(",") if name.strip()]
+    unknown = [name for name in args.link if name not in LINK_STRATEGIES]
+    if unknown:
+        p.error(f"unknown --link strategies: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    with cprofile_to(args.cprofile):
+        rc = run(args)
+    if args.profile:
+        PROFILER.print_breakdown()
+    return rc
+
+
+def run(args: argparse.Namespace) -> int:
+    from import_report import ReportWriter
+
+    if args.aliases:
+        set_customer_aliases(load_alias_store(args.aliases))
+    zoho_path = args.zoho
+    eboek_path = args.eboekhouden
 
     out_sql = Path("import_all_invoices_deduped.sql")
-    out_report = Path("import_all_invoices_deduped_report.json")
-    out_sql.write_text(sql, encoding="utf-8")
+    out_report = Path("import_all_invoices_deduped_report.jsonl")
+    out_overlaps = Path("import_all_invoices_deduped_overlaps.csv")
+    # Rewritten after every batch; --resume picks up from it (import_checkpoint.py)
+    checkpoint = open_checkpoint(
+        checkpoint_path_for(str(out_sql)), {"zoho": zoho_path, "eboekhouden": eboek_path}, resume=args.resume
+    )
 
-    report = {
-        "inputs": {"zoho": zoho_path, "eboekhouden": eboek_path},
-        **zoho_report,
-        **eboek_report,
-        **merge_report,
-    }
-    out_report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Report lines are written as each stage finishes (see import_report.py)
+    with ReportWriter(out_report) as report, overlap_table(out_overlaps) as write_overlap:
+        report.stage("inputs", {"zoho": zoho_path, "eboekhouden": eboek_path})
+
+        with stage("parse") as st:
+            (zoho_invoices, zoho_report), (eboek_invoices, eboek_report) = parse_sources(
+                zoho_path,
+                eboek_path,
+                presorted=False if args.zoho_unsorted else None,
+                columnar=args.columnar,
+                workers=args.parse_workers or os.cpu_count() or 1,
+            )
+            st.rows = zoho_report["zoho_line_rows"] + eboek_report["eboekhouden_invoice_count"]
+        checkpoint.record_input("zoho", zoho_path)
+        checkpoint.record_input("eboekhouden", eboek_path)
+        PROFILER.count_all("zoho.skipped", zoho_report.get("zoho_skipped_rows", {}))
+        PROFILER.count_all("eboekhouden.skipped", eboek_report.get("eboekhouden_skipped_rows", {}))
+        report.stage("zoho", zoho_report)
+        report.stage("eboekhouden", eboek_report)
+
+        def _on_overlap(rec: Dict[str, Any]) -> None:
+            write_overlap(rec)
+            report.write("overlap", **rec)
+
+        with stage("merge") as st:
+            merged, merge_report = merge_dedupe(
+                zoho_invoices, eboek_invoices, args.link, date_window_days=args.date_window, on_record=_on_overlap
+            )
+            st.rows = len(zoho_invoices) + len(eboek_invoices)
+        report.stage("merge", {**merge_report, "overlaps_file": str(out_overlaps)})
+        if args.compact:
+            merged = InvoiceColumns(merged)
+            del zoho_invoices, eboek_invoices
+
+        # Incremental: only what changed since the manifest's run
+        manifest = delta = None
+        to_load = merged
+        if args.manifest:
+            from import_manifest import load_manifest, missing_invoices_sql
+
+            with stage("manifest") as st:
+                manifest = load_manifest(args.manifest)
+                delta = manifest.delta(merged)
+                to_load = delta.upserts
+                st.rows = len(merged)
+            for system, external_id in delta.missing:
+                report.write("missing_invoice", external_system=system, external_id=external_id, action=args.missing)
+
+        # No customer_match_key(): the upsert skips these, so list them instead of losing them silently
+        unmatched = unmatched_customer_invoices(to_load)
+        for inv in unmatched:
+            report.write(
+                "unmatched_customer",
+                customer_name=inv.customer_name,
+                invoice_number=inv.invoice_number,
+                external_system=inv.external_system,
+                external_id=inv.external_id,
+            )
+        unmatched_report = {"unmatched_customer_invoices": len(unmatched)}
+
+        customer_ids: Optional[Dict[str, str]] = None
+        snapshot_report: Dict[str, Any] = {}
+        if args.customers:
+            from customer_snapshot import load_snapshot
+
+            with stage("customers") as st:
+                customer_ids = load_snapshot(args.customers).resolve_all(inv.customer_name for inv in to_load)
+                st.rows = len(to_load)
+            unresolved = sorted({inv.customer_name for inv in to_load} - set(customer_ids))
+            for name in unresolved:
+                report.write("unresolved_customer", customer_name=name)
+            snapshot_report = {
+                "customers_resolved_client_side": len(customer_ids),
+                "customers_unresolved": len(unresolved),
+            }
+            report.stage("customers", snapshot_report)
+
+        db_report: Dict[str, Any] = {}
+        resumed_batches = 0
+        if args.dsn:
+            from invoice_db_loader import apply_missing_invoices, load_invoices
+
+            with stage("db") as st:
+                db_report = load_invoices(
+                    args.dsn, to_load, batch_size=args.batch_size, workers=args.workers, checkpoint=checkpoint
+                )
+                if delta is not None:
+                    db_report["db_missing_invoices_" + args.missing] = apply_missing_invoices(
+                        args.dsn, delta.missing, args.missing
+                    )
+                st.rows = len(to_load)
+            resumed_batches = db_report["db_batches_skipped"]
+            report.stage("db", db_report)
+        else:
+            copy_format = {"values": None, "copy": "text", "copy-csv": "csv"}[args.format]
+            trailer = missing_invoices_sql(delta.missing, args.missing) if delta is not None else ""
+            plan = _plan_batches(to_load, args.batch_size, customer_ids)
+            checkpoint.start(
+                batch_plan_digest(plan, customer_ids, format=args.format, trailer=trailer), len(plan), output=str(out_sql)
+            )
+            resumed_batches = len(checkpoint.done)
+            sql_bytes = write_sql_file(out_sql, to_load, plan, checkpoint, copy_format, customer_ids, trailer)
+            PROFILER.count("sql.bytes_written", sql_bytes)
+            report.stage("sql", {"sql_file": str(out_sql), "sql_invoices": len(to_load)})
+
+        manifest_report: Dict[str, Any] = {}
+        if manifest is not None:
+            manifest.apply(delta, args.missing)
+            manifest.save()
+            manifest_report = {"manifest": args.manifest, **delta.report(), "missing_action": args.missing}
+            report.stage("manifest", manifest_report)
+        if checkpoint.resumed:
+            report.stage("checkpoint", {"checkpoint": str(checkpoint.path), "batches_skipped": resumed_batches})
+        checkpoint.remove()
+
+        report.stage("profile", PROFILER.report())
+        report.close(
+            {
+                **zoho_report,
+                **eboek_report,
+                **merge_report,
+                **unmatched_report,
+                **snapshot_report,
+                **manifest_report,
+                **db_report,
+            }
+        )
 
     # Print short summary to stdout
-    print(f"✅ Wrote {out_sql} ({len(merged)} invoices) and {out_report}")
+    if args.dsn:
+        print(f"✅ Loaded {len(to_load)} invoices into the database ({db_report['db_batches']} batches); wrote {out_report}")
+        print(f"- New customers: {db_report['db_new_customers']}, inserted invoices: {db_report['db_inserted_invoices']}")
+    else:
+        print(f"✅ Wrote {out_sql} ({len(to_load)} invoices) and {out_report}")
     print(f"- Zoho invoices: {zoho_report.get('zoho_invoice_count')} (from {zoho_report.get('zoho_line_rows')} line-rows)")
     print(f"- e-boekhouden invoices: {eboek_report.get('eboekhouden_invoice_count')}")
-    print(f"- Overlap invoice_numbers (Zoho preferred): {merge_report.get('overlap_invoice_numbers')}")
+    print(
+        f"- Overlaps (Zoho preferred): {merge_report.get('overlap_invoice_numbers')}, "
+        f"{merge_report.get('overlap_conflicts_count')} with different amounts (see {out_overlaps})"
+    )
+    if unmatched:
+        print(
+            f"- ⚠️  Skipped {len(unmatched)} invoices whose customer name has no letters or digits "
+            f"(unmatched_customer in {out_report})"
+        )
+    if delta is not None:
+        print(
+            f"- Manifest: {delta.new} new, {delta.changed} changed, {delta.unchanged} unchanged, "
+            f"{len(delta.missing)} missing ({args.missing})"
+        )
+    if checkpoint.resumed:
+        print(f"- Resumed from {checkpoint.path}: {resumed_batches} batches were already done")
     return 0
 
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Shared customer alias store: export customer name -> customer name in the platform.
+
+All converters resolve names through one file (customer_aliases.json next to this
+module, or --aliases PATH), loaded once per path. Lookups go through a precomputed
+folded key, so "Best Bottles B.V.", "best bottles bv" and "Best Bottles" all hit
+the same alias:
+  - case and punctuation are ignored (like customer_match_key())
+  - trailing legal forms are dropped (B.V., BV, V.O.F., N.V., ...)
+
+The file is a flat JSON object {"alias": "canonical name"}.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DEFAULT_ALIASES_PATH = Path(__file__).with_name("customer_aliases.json")
+
+# Legal-form tokens after joining dots ("B.V." -> "bv", "V.O.F." -> "vof")
+LEGAL_FORM_TOKENS = frozenset({"bv", "nv", "vof", "cv", "ez", "bvba", "gmbh", "ltd", "inc", "llc"})
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def alias_tokens(name: str) -> Tuple[str, ...]:
+    """Lowercase word tokens; dots and apostrophes are joined first (B.V. -> bv, Foo's -> foos)."""
+    text = (name or "").lower().replace(".", "").replace("'", "").replace("’", "")
+    return tuple(_TOKEN.findall(text))
+
+
+def alias_key(name: str) -> Optional[str]:
+    """Folded lookup key: tokens without trailing legal forms, concatenated."""
+    tokens = list(alias_tokens(name))
+    while len(tokens) > 1 and tokens[-1] in LEGAL_FORM_TOKENS:
+        tokens.pop()
+    return "".join(tokens) or None
+
+
+@dataclass
+class AliasStore:
+    aliases: Dict[str, str] = field(default_factory=dict)
+    by_key: Dict[str, str] = field(default_factory=dict)
+    # resolve() results per raw export name (exports repeat the same customers)
+    _resolved: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, aliases: Dict[str, str]) -> "AliasStore":
+        store = cls(aliases=dict(aliases))
+        for alias, canonical in aliases.items():
+            key = alias_key(alias)
+            if not key:
+                continue
+            if store.by_key.get(key, canonical) != canonical:
+                raise ValueError(f"customer aliases conflict: {alias!r} folds onto an alias for {store.by_key[key]!r}")
+            store.by_key[key] = canonical
+        return store
+
+    def resolve(self, name: str) -> str:
+        """Canonical customer name for `name` (stripped), or `name` itself without an alias."""
+        hit = self._resolved.get(name)
+        if hit is not None:
+            return hit
+        stripped = (name or "").strip()
+        key = alias_key(stripped)
+        out = self.by_key.get(key, stripped) if key else stripped
+        if name is not None:
+            self._resolved[name] = out
+        return out
+
+
+_STORES: Dict[str, AliasStore] = {}
+
+
+def load_alias_store(path: Optional[str] = None) -> AliasStore:
+    """The alias store for `path` (default customer_aliases.json); read once per path."""
+    p = str(Path(path) if path else DEFAULT_ALIASES_PATH)
+    store = _STORES.get(p)
+    if store is None:
+        with open(p, "r", encoding="utf-8") as f:
+            store = _STORES[p] = AliasStore.from_dict(json.load(f))
+    return store
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Client-side customer resolution from a snapshot of public.customers.
+
+Instead of resolving customer_name -> customer_id in SQL (mapping CTEs), the
+converters can resolve it in Python and emit concrete UUIDs:
+  python3 convert_all_invoices_to_sql.py zoho.csv eboekhouden.tsv --customers customers.csv
+
+The snapshot is either a CSV dump of public.customers (Supabase table export;
+needs `id` plus any of name, company_name, domain, website,
+hubspot_primary_domain, hubspot_website_url) or a postgresql:// DSN that is
+queried directly (needs psycopg).
+
+CSV snapshots are indexed once and cached next to the file
+(<snapshot>.index.json); the cache is rebuilt when the CSV's mtime/size change.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from convert_all_invoices_to_sql import customer_match_key
+from import_hubspot_data import domain_key
+
+CACHE_VERSION = 2  # 2: domains keyed by domain_key() (www. stripped)
+
+DOMAIN_COLUMNS = ("domain", "hubspot_primary_domain", "website", "hubspot_website_url")
+
+SNAPSHOT_QUERY = """SELECT id::text, name, company_name, domain, website,
+       hubspot_primary_domain, hubspot_website_url, created_at
+FROM public.customers
+ORDER BY created_at NULLS LAST, id"""
+
+
+def customer_domain_key(value: str) -> Optional[str]:
+    """domain_key() of a customers domain/website cell (or a name that is a domain); None for anything else."""
+    value = (value or "").strip()
+    if not value or " " in value or "." not in value:
+        return None
+    return domain_key(value)
+
+
+@dataclass
+class CustomerSnapshot:
+    """customer_match_key / normalized domain -> customer id."""
+
+    by_company_key: Dict[str, str] = field(default_factory=dict)
+    by_name_key: Dict[str, str] = field(default_factory=dict)
+    by_domain: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, row: Dict[str, str]) -> None:
+        # First row wins, like the SQL mapping (ordered by created_at).
+        cid = (row.get("id") or "").strip()
+        if not cid:
+            return
+        k = customer_match_key(row.get("company_name") or "")
+        if k:
+            self.by_company_key.setdefault(k, cid)
+        k = customer_match_key(row.get("name") or "")
+        if k:
+            self.by_name_key.setdefault(k, cid)
+        for col in DOMAIN_COLUMNS:
+            d = customer_domain_key(row.get(col) or "")
+            if d:
+                self.by_domain.setdefault(d, cid)
+
+    def resolve(self, customer_name: str) -> Optional[str]:
+        """company_name key first (same priority as the SQL mapping), then name, then domain."""
+        k = customer_match_key(customer_name)
+        if k:
+            cid = self.by_company_key.get(k) or self.by_name_key.get(k)
+            if cid:
+                return cid
+        d = customer_domain_key(customer_name)
+        return self.by_domain.get(d) if d else None
+
+    def resolve_all(self, customer_names: Iterable[str]) -> Dict[str, str]:
+        """{customer_name: customer_id} for every name the snapshot knows."""
+        out: Dict[str, str] = {}
+        for name in set(customer_names):
+            cid = self.resolve(name)
+            if cid:
+                out[name] = cid
+        return out
+
+    def to_json(self) -> Dict[str, Dict[str, str]]:
+        return {
+            "by_company_key": self.by_company_key,
+            "by_name_key": self.by_name_key,
+            "by_domain": self.by_domain,
+        }
+
+
+def _cache_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + ".index.json")
+
+
+def _fingerprint(csv_path: Path) -> List[int]:
+    st = csv_path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _rows_sorted(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    if rows and "created_at" in rows[0]:
+        # Empty created_at last, like ORDER BY created_at NULLS LAST
+        return sorted(rows, key=lambda r: (not r.get("created_at"), r.get("created_at") or ""))
+    return rows
+
+
+def load_snapshot_csv(csv_path: str, use_cache: bool = True) -> CustomerSnapshot:
+    path = Path(csv_path)
+    cache = _cache_path(path)
+    fp = _fingerprint(path)
+
+    if use_cache and cache.exists():
+        try:
+            data = json.loads(cache.read_text(encoding="utf-8"))
+            if data.get("version") == CACHE_VERSION and data.get("source") == fp:
+                return CustomerSnapshot(**data["index"])
+        except (ValueError, KeyError, TypeError):
+            pass  # corrupt/old cache: rebuild
+
+    snap = CustomerSnapshot()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in _rows_sorted(list(csv.DictReader(f))):
+            snap.add(row)
+
+    if use_cache:
+        tmp = cache.with_name(cache.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "source": fp, "index": snap.to_json()}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, cache)
+    return snap
+
+
+def _db_rows(dsn: str) -> List[Dict[str, str]]:
+    try:
+        import psycopg
+        from psycopg.rows import dict_row
+    except ImportError as e:
+        raise RuntimeError('a DSN customers snapshot needs psycopg: pip install "psycopg[binary]"') from e
+
+    with psycopg.connect(dsn, row_factory=dict_row) as conn, conn.cursor() as cur:
+        cur.execute(SNAPSHOT_QUERY)
+        return cur.fetchall()
+
+
+def load_snapshot_db(dsn: str) -> CustomerSnapshot:
+    snap = CustomerSnapshot()
+    for row in _db_rows(dsn):
+        snap.add(row)
+    return snap
+
+
+def read_customer_rows(source: str) -> List[Dict[str, str]]:
+    """Raw customer rows (oldest first) from a CSV dump path or postgresql:// DSN."""
+    if source.startswith(("postgres://", "postgresql://")):
+        return _db_rows(source)
+    with open(source, "r", encoding="utf-8-sig", newline="") as f:
+        return _rows_sorted(list(csv.DictReader(f)))
+
+
+def load_snapshot(source: str) -> CustomerSnapshot:
+    """CSV dump path or postgresql:// DSN."""
+    if source.startswith(("postgres://", "postgresql://")):
+        return load_snapshot_db(source)
+    return load_snapshot_csv(source)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Export format sniffing: which export a file is, and how to read it.
+
+Only the first SNIFF_BYTES are read. From the header line found there:
+  source        invoice_sources.py adapter name (zoho, eboekhouden, eboekhouden_semicolon, missing)
+  delimiter     "," / ";" / "\\t"
+  encoding      utf-8-sig (BOM), utf-8 or cp1252 (Excel "CSV (Windows)" saves)
+  header_offset byte offset of the header line (e-boekhouden puts a report preamble above it)
+  data_offset   byte offset of the first data line
+
+open_export() seeks straight to the header, so the parsers stream the file instead of
+reading it whole just to find where the data starts. Results are cached per file
+fingerprint (path, mtime, size): the parse workers, the chunk planner and the adapters
+all ask for the same file without reading it again.
+
+  python3 export_format.py export.csv [more.csv ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import io
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+SNIFF_BYTES = 64 * 1024
+
+DELIMITERS = ("\t", ";", ",")
+
+# (source, delimiters it applies to or None for any, header columns that identify it); first match wins
+SIGNATURES: List[Tuple[str, Optional[Tuple[str, ...]], Tuple[str, ...]]] = [
+    ("zoho", None, ("Invoice ID", "Invoice Number", "Invoice Date")),
+    ("eboekhouden", ("\t",), ("Datum", "Nummer", "Relatie")),
+    ("eboekhouden_semicolon", None, ("Datum", "Nummer", "Relatie")),
+    ("missing", None, ("invoice_number", "invoice_date", "amount_incl")),
+]
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    source: str
+    delimiter: str
+    encoding: str
+    header_offset: int
+    data_offset: int
+    header: Tuple[str, ...]
+
+
+Fingerprint = Tuple[str, int, int]
+
+_CACHE: Dict[Fingerprint, ExportFormat] = {}
+
+
+def fingerprint(path: str) -> Fingerprint:
+    st = os.stat(path)
+    return os.path.realpath(path), st.st_mtime_ns, st.st_size
+
+
+def _sample_encoding(sample: bytes) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the sample size is fine
+        if e.start < len(sample) - 3:
+            return "cp1252"
+    return "utf-8"
+
+
+def _match(cells: Sequence[str], delimiter: str) -> Optional[str]:
+    names = {c.strip().lstrip("\ufeff") for c in cells}
+    for source, delimiters, required in SIGNATURES:
+        if (delimiters is None or delimiter in delimiters) and names.issuperset(required):
+            return source
+    return None
+
+
+def detect_format(sample: bytes, complete: bool = False) -> Optional[ExportFormat]:
+    """
+    ExportFormat for the first bytes of a file (`complete`: the whole file); None when no
+    known header is in the sample.
+    """
+    encoding = _sample_encoding(sample)
+    offset = len(codecs.BOM_UTF8) if encoding == "utf-8-sig" else 0
+    text_encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+    lines = sample[offset:].split(b"\n")
+    if not complete:
+        lines.pop()  # may be cut off
+    for raw in lines:
+        line = raw.decode(text_encoding, errors="replace").rstrip("\r")
+        for delimiter in DELIMITERS:
+            if delimiter not in line:
+                continue
+            cells = next(csv.reader([line], delimiter=delimiter), [])
+            source = _match(cells, delimiter)
+            if source:
+                return ExportFormat(
+                    source=source,
+                    delimiter=delimiter,
+                    encoding=encoding,
+                    header_offset=offset,
+                    data_offset=offset + len(raw) + 1,
+                    header=tuple(c.strip() for c in cells),
+                )
+        offset += len(raw) + 1
+    return None
+
+
+def sniff_export(path: str, sample_bytes: int = SNIFF_BYTES) -> ExportFormat:
+    """ExportFormat of `path` (cached per fingerprint); ValueError for files that match no known export."""
+    fp = fingerprint(path)
+    fmt = _CACHE.get(fp)
+    if fmt is None:
+        with open(path, "rb") as f:
+            sample = f.read(sample_bytes)
+        fmt = detect_format(sample, complete=len(sample) < sample_bytes)
+        if fmt is None:
+            raise ValueError(f"{path}: not a known invoice export (no header in the first {sample_bytes} bytes)")
+        _CACHE[fp] = fmt
+    return fmt
+
+
+def sniff_export_or(path: str, sources: Sequence[str], default: ExportFormat) -> ExportFormat:
+    """sniff_export() when it finds one of `sources`, else `default` (the parser's fixed assumptions)."""
+    try:
+        fmt = sniff_export(path)
+    except ValueError:
+        return default
+    return fmt if fmt.source in sources else default
+
+
+def assumed_format(source: str, delimiter: str) -> ExportFormat:
+    """What a parser assumes without sniffing: header on the first line, utf-8 with optional BOM."""
+    return ExportFormat(source, delimiter, "utf-8-sig", 0, 0, ())
+
+
+def open_export(path: str, fmt: Optional[ExportFormat] = None) -> TextIO:
+    """Text stream (newline='', for csv) positioned at the header line; the caller closes it."""
+    fmt = fmt or sniff_export(path)
+    raw = open(path, "rb")
+    raw.seek(fmt.header_offset)
+    # Past a BOM already: decode the rest as plain utf-8
+    encoding = "utf-8" if fmt.encoding == "utf-8-sig" and fmt.header_offset else fmt.encoding
+    return io.TextIOWrapper(raw, encoding=encoding, newline="")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Detect the export type, delimiter, encoding and header offset of files.")
+    p.add_argument("paths", nargs="+")
+    args = p.parse_args(argv)
+    rc = 0
+    for path in args.paths:
+        try:
+            fmt = sniff_export(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            rc = 1
+            continue
+        print(
+            f"✅ {path}: {fmt.source} (delimiter {fmt.delimiter!r}, {fmt.encoding}, "
+            f"header at byte {fmt.header_offset}, {len(fmt.header)} columns)"
+        )
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Resumable invoice imports: a checkpoint file rewritten after every completed batch.
+
+  python3 convert_all_invoices_to_sql.py zoho.csv eb.tsv --batch-size 5000 --dsn postgresql://...
+  # connection dropped halfway: continue after the last committed batch
+  python3 convert_all_invoices_to_sql.py zoho.csv eb.tsv --batch-size 5000 --dsn postgresql://... --resume
+
+  python3 convert_eboekhouden_csv_to_sql.py export.csv --batch-size 5000 -o import.sql --resume
+
+The checkpoint (JSON) records:
+  inputs        per input: path, size, mtime and the byte offset parsed up to
+  plan          digest of the batch plan (which invoices in which batch, output format, target)
+  last_batch    every batch up to and including this one is done; batches_done_after lists
+                the done ones beyond it (--workers commits batches out of order)
+  output        the SQL file and its size after the last completed batch
+
+The converters need a whole export before the first batch (dedupe, totals in the header),
+so a resumed run parses again and then skips the batches that are done: the SQL file is
+cut back to the recorded size (dropping a half-written batch) and appended to, and with
+--dsn done batches aren't sent again. Every batch is an idempotent upsert, so one that
+committed after the last checkpoint write is just applied twice.
+
+--resume refuses a checkpoint whose inputs or batch plan changed. The checkpoint is
+deleted when the run finishes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Set
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path_for(output: str) -> Path:
+    """Default checkpoint location: next to the output file."""
+    return Path(output + ".checkpoint.json")
+
+
+def plan_digest(batches: Iterable[Iterable[str]], **options: Any) -> str:
+    """Digest of a batch plan: `options` plus the key of every row, batch by batch."""
+    h = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    for batch in batches:
+        h.update(b"\x1d")
+        for key in batch:
+            h.update(key.encode("utf-8"))
+            h.update(b"\x1e")
+    return h.hexdigest()
+
+
+@dataclass
+class ImportCheckpoint:
+    path: Path
+    inputs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    plan: str = ""
+    batches: int = 0
+    done: Set[int] = field(default_factory=set)
+    output: Optional[str] = None
+    output_bytes: int = 0
+    resumed: bool = False  # loaded from disk by --resume
+    _lock: Any = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def last_batch(self) -> int:
+        n = 0
+        while n + 1 in self.done:
+            n += 1
+        return n
+
+    def is_done(self, batch: int) -> bool:
+        return batch in self.done
+
+    def record_input(self, name: str, path: str, offset: Optional[int] = None) -> None:
+        """Input `name` was parsed up to byte `offset` (default: all of it)."""
+        st = os.stat(path)
+        self.inputs[name] = {
+            "path": os.path.realpath(path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "offset": st.st_size if offset is None else offset,
+        }
+
+    def check_inputs(self, paths: Dict[str, str]) -> None:
+        """ValueError unless `paths` (name -> path) are the files the checkpoint was written for, unchanged."""
+        if set(paths) != set(self.inputs):
+            raise ValueError(f"{self.path}: written for inputs {sorted(self.inputs)}, not {sorted(paths)}")
+        for name, path in paths.items():
+            saved = self.inputs[name]
+            st = os.stat(path)
+            if (os.path.realpath(path), st.st_size, st.st_mtime_ns) != (saved["path"], saved["size"], saved["mtime_ns"]):
+                raise ValueError(f"{path} changed since the checkpoint {self.path}; run without --resume to start over")
+
+    def start(self, plan: str, batches: int, output: Optional[str] = None) -> None:
+        """Binds the checkpoint to a batch plan; a resumed one must have the same plan and output."""
+        if self.resumed:
+            if plan != self.plan or batches != self.batches:
+                raise ValueError(
+                    f"{self.path}: the batch plan changed since the checkpoint (invoices, --batch-size, "
+                    "--format or target); run without --resume to start over"
+                )
+            if output is not None and output != self.output:
+                raise ValueError(f"{self.path}: written for output {self.output!r}, not {output!r}")
+        else:
+            self.plan, self.batches = plan, batches
+            if output is not None:
+                self.output = output
+            self.done = set()
+            self.output_bytes = 0
+        self.save()
+
+    def mark_batch(self, batch: int, output_bytes: Optional[int] = None) -> None:
+        """Batch `batch` (1-based) is written/committed; saved right away. Thread-safe."""
+        with self._lock:
+            self.done.add(batch)
+            if output_bytes is not None:
+                self.output_bytes = output_bytes
+            self.save()
+
+    def to_json(self) -> Dict[str, Any]:
+        last = self.last_batch
+        return {
+            "version": CHECKPOINT_VERSION,
+            "inputs": self.inputs,
+            "plan": self.plan,
+            "batches": self.batches,
+            "last_batch": last,
+            "batches_done_after": sorted(b for b in self.done if b > last),
+            "output": self.output,
+            "output_bytes": self.output_bytes,
+        }
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_json(), ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        """The run finished: nothing left to resume."""
+        self.path.unlink(missing_ok=True)
+
+
+def load_checkpoint(path: Path) -> Optional[ImportCheckpoint]:
+    """The checkpoint at `path`; None when there is none."""
+    p = Path(path)
+    if not p.exists():
+        return None
+    data = json.loads(p.read_text(encoding="utf-8"))
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {data.get('version')!r}")
+    last = data.get("last_batch", 0)
+    return ImportCheckpoint(
+        path=p,
+        inputs=data.get("inputs", {}),
+        plan=data.get("plan", ""),
+        batches=data.get("batches", 0),
+        done=set(range(1, last + 1)) | set(data.get("batches_done_after", [])),
+        output=data.get("output"),
+        output_bytes=data.get("output_bytes", 0),
+        resumed=True,
+    )
+
+
+def open_checkpoint(path: Path, inputs: Dict[str, str], resume: bool = False) -> ImportCheckpoint:
+    """
+    Checkpoint for a run over `inputs` (name -> path): with `resume` the saved one (ValueError
+    if its inputs changed), else a fresh one. Call record_input() once an input is parsed.
+    """
+    checkpoint = load_checkpoint(path) if resume else None
+    if checkpoint is None:
+        if resume:
+            print(f"ℹ️  No checkpoint at {path}, starting from the beginning", file=sys.stderr)
+        return ImportCheckpoint(Path(path))
+    checkpoint.check_inputs(inputs)
+    return checkpoint
+
+
+def open_resumable(path: str, checkpoint: ImportCheckpoint, buffering: int = -1) -> BinaryIO:
+    """`path` opened for writing: cut back to checkpoint.output_bytes and positioned there, or truncated."""
+    if not checkpoint.output_bytes:
+        return open(path, "wb", buffering=buffering)
+    if not os.path.exists(path) or os.path.getsize(path) < checkpoint.output_bytes:
+        raise ValueError(f"{path} is shorter than at the checkpoint {checkpoint.path}; run without --resume to start over")
+    f = open(path, "r+b", buffering=buffering)
+    f.truncate(checkpoint.output_bytes)
+    f.seek(checkpoint.output_bytes)
+    return f
@@ -2,12 +2,21 @@
 """
 Script om HubSpot CSV export te importeren in de profiles tabel.
 Genereert een SQL script dat kan worden uitgevoerd in Supabase.
+
+  python3 import_hubspot_data.py export.csv import_hubspot_data.sql [--batch-size 1000]
+  python3 import_hubspot_data.py export.csv import_hubspot_data.sql --format copy   # psql -f
 """
 
+import argparse
 import csv
+import os
 import re
+from operator import itemgetter
 from urllib.parse import urlparse
 
+from convert_all_invoices_to_sql import customer_match_key
+from import_profile import PROFILER, cprofile_to, stage
+
 def normalize_domain(url):
     """Normaliseer een URL naar een domeinnaam."""
     if not url or url.strip() == '':
@@ -31,6 +40,18 @@ def normalize_domain(url):
     except:
         return None
 
+def domain_key(value):
+    """
+    Match key voor domeinen: normalize_domain() zonder www. (ook hoofdletters).
+    Keep in sync with public.customer_domain_key() (migratie 20260302000000_customer_domain_keys.sql).
+    """
+    domain = normalize_domain(value)
+    if not domain:
+        return None
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain or None
+
 def normalize_phone(phone):
     """Normaliseer telefoonnummer."""
     if not phone or phone.strip() == '':
@@ -48,232 +69,345 @@ def escape_sql_string(value):
     value = str(value).replace("'", "''")
     return f"'{value}'"
 
-def generate_sql(csv_file_path, output_sql_path):
-    """Genereer SQL import script."""
-    
-    # Mapping van CSV kolommen naar database velden
-    # Kolom indices (0-based)
-    COLUMNS = {
-        'company_name': 'Naam onderneming',
-        'website_url': 'Website-URL',
-        'domain_name': 'Domeinnaam onderneming',
-        'phone': 'Telefoonnummer',
-        'city': 'Plaats',
-        'postal_code': 'Postcode',
-        'province': 'Provincie/regio',
-        'country': 'Land/regio',
-        'description': 'Beschrijving',
-        'industry': 'Branche',
-        'address': 'Adres',
-        'address2': 'Adres 2',
-    }
-    
-    # Lees CSV en vind kolom indices
-    with open(csv_file_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        
-        # Vind kolom indices
-        col_indices = {}
-        for db_field, csv_col_name in COLUMNS.items():
-            try:
-                col_indices[db_field] = header.index(csv_col_name)
-            except ValueError:
-                col_indices[db_field] = None
-                print(f"⚠️  Kolom '{csv_col_name}' niet gevonden in CSV")
-    
-    # Genereer SQL
-    sql_lines = [
-        "-- HubSpot Data Import Script",
-        "-- Genereerd automatisch vanuit CSV export",
-        "",
-        "-- Stap 1: Maak temporary table aan",
-        "CREATE TEMP TABLE IF NOT EXISTS hubspot_import (",
-        "    company_name TEXT,",
-        "    domain TEXT,",
-        "    phone TEXT,",
-        "    city TEXT,",
-        "    postal_code TEXT,",
-        "    province TEXT,",
-        "    country TEXT,",
-        "    description TEXT,",
-        "    industry TEXT,",
-        "    address TEXT,",
-        "    address2 TEXT",
-        ");",
-        "",
-        "-- Stap 2: Insert data in temporary table",
-    ]
-    
-    # Lees CSV data
+DEFAULT_CSV_FILE = '/Users/rogierschoenmakers/Downloads/hubspot-crm-exports-alle-bedrijven-ontbrekende-ge-2026-01-13 (1).csv'
+DEFAULT_SQL_FILE = '/Users/rogierschoenmakers/Documents/Platform/gs-lead-platform/import_hubspot_data.sql'
+
+# Mapping van database velden naar HubSpot CSV kolommen
+HUBSPOT_COLUMNS = {
+    'company_name': 'Naam onderneming',
+    'website_url': 'Website-URL',
+    'domain_name': 'Domeinnaam onderneming',
+    'phone': 'Telefoonnummer',
+    'city': 'Plaats',
+    'postal_code': 'Postcode',
+    'province': 'Provincie/regio',
+    'country': 'Land/regio',
+    'description': 'Beschrijving',
+    'industry': 'Branche',
+    'address': 'Adres',
+    'address2': 'Adres 2',
+}
+
+SQL_HEADER_LINES = [
+    "-- HubSpot Data Import Script",
+    "-- Genereerd automatisch vanuit CSV export",
+    "-- Requires migrations 20260301000000_customer_match_keys.sql + 20260302000000_customer_domain_keys.sql",
+    "",
+    "-- Stap 1: Maak temporary table aan",
+    "-- Eerst opruimen: na een mislukte run in dezelfde sessie bestaan de tabellen nog (met oude kolommen)",
+    "DROP TABLE IF EXISTS hubspot_matches;",
+    "DROP TABLE IF EXISTS hubspot_import;",
+    "CREATE TEMP TABLE hubspot_import (",
+    "    import_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,",
+    "    company_name TEXT,",
+    "    domain TEXT,",
+    "    phone TEXT,",
+    "    city TEXT,",
+    "    postal_code TEXT,",
+    "    province TEXT,",
+    "    country TEXT,",
+    "    description TEXT,",
+    "    industry TEXT,",
+    "    address TEXT,",
+    "    address2 TEXT,",
+    "    company_key TEXT, -- customer_match_key(company_name), in Python berekend",
+    "    domain_key TEXT,  -- domain_key(domain), in Python berekend",
+    "    matched_customer_id UUID, -- company_matcher.py (alleen met --customers)",
+    "    match_confidence NUMERIC",
+    ");",
+    "",
+]
+
+STAGING_COLUMNS = (
+    'company_name', 'domain', 'phone', 'city', 'postal_code', 'province',
+    'country', 'description', 'industry', 'address', 'address2',
+    'company_key', 'domain_key', 'matched_customer_id', 'match_confidence',
+)
+
+# customers kolom <- hubspot_import kolom (stap 4)
+CUSTOMER_FIELD_UPDATES = (
+    ('phone', 'phone'),
+    ('city', 'city'),
+    ('postal_code', 'postal_code'),
+    ('country', 'country'),
+    ('address', 'address'),
+    ('domain', 'domain'),
+    ('hubspot_company_name', 'company_name'),
+    ('hubspot_primary_domain', 'domain'),
+    ('hubspot_website_url', 'domain'),
+    ('hubspot_phone', 'phone'),
+    ('hubspot_city', 'city'),
+    ('hubspot_postcode', 'postal_code'),
+    ('hubspot_country', 'country'),
+    ('hubspot_address1', 'address'),
+    ('hubspot_industry', 'industry'),
+)
+
+# (match_kind, customers key kolom, hubspot_import key kolom), in volgorde van prioriteit.
+# Elke join is een gelijkheid op een geïndexeerde key (migraties 20260301000000 + 20260302000000).
+MATCH_RULES = (
+    ('company_name', 'company_name_key', 'company_key'),
+    ('domain', 'domain_key', 'domain_key'),
+    ('domain', 'hubspot_primary_domain_key', 'domain_key'),
+    ('domain', 'hubspot_website_url_key', 'domain_key'),
+    ('name', 'name_key', 'company_key'),
+    ('fuzzy', 'id', 'matched_customer_id'),
+)
+
+# Matches waarbij alleen lege velden worden aangevuld
+FILL_ONLY_MATCH_KINDS = ('name', 'fuzzy')
+
+# Rijen per INSERT ... VALUES statement (--format values)
+DEFAULT_BATCH_SIZE = 1000
+
+def compile_row_extractor(header, columns=HUBSPOT_COLUMNS):
+    """
+    Zoekt de kolom indices één keer op en geeft (extract, min_len) terug.
+    extract(row) -> lijst met gestripte waarden in de volgorde van `columns`
+    ('' voor kolommen die niet in de CSV staan); rijen korter dan min_len worden overgeslagen.
+    """
+    indices = []
+    for csv_col_name in columns.values():
+        try:
+            indices.append(header.index(csv_col_name))
+        except ValueError:
+            indices.append(None)
+            print(f"⚠️  Kolom '{csv_col_name}' niet gevonden in CSV")
+
+    present = [i for i in indices if i is not None]
+    min_len = max(present or [0]) + 1
+    if not present:
+        return (lambda row: [''] * len(indices)), min_len
+
+    if len(present) == 1:
+        # itemgetter met één index geeft geen tuple terug
+        only = present[0]
+        slots = [i is not None for i in indices]
+        return (lambda row: [row[only].strip() if has else '' for has in slots]), min_len
+
+    getter = itemgetter(*present)
+    strip = str.strip
+    if len(present) == len(indices):
+        return (lambda row: list(map(strip, getter(row)))), min_len
+
+    slots = [i is not None for i in indices]
+    def extract(row):
+        values = iter(map(strip, getter(row)))
+        return [next(values) if has else '' for has in slots]
+    return extract, min_len
+
+def iter_hubspot_records(reader, extract, min_len, matcher=None, min_confidence=None, skipped=None):
+    """
+    Yieldt per bruikbare CSV rij de waarden voor hubspot_import, in de volgorde van STAGING_COLUMNS.
+    Met een company_matcher.CompanyMatcher worden matched_customer_id/match_confidence ingevuld.
+    skipped: optionele dict die per reden telt hoeveel rijen zijn overgeslagen.
+    """
+    if skipped is None:
+        skipped = {}
+    for row in reader:
+        if len(row) < min_len:
+            skipped['short_row'] = skipped.get('short_row', 0) + 1
+            continue
+
+        (company_name, website_url, domain_name, phone, city, postal_code,
+         province, country, description, industry, address, address2) = extract(row)
+
+        # Skip lege rijen
+        if not company_name and not website_url and not domain_name:
+            skipped['empty'] = skipped.get('empty', 0) + 1
+            continue
+
+        # Normaliseer domain
+        domain = normalize_domain(website_url) or normalize_domain(domain_name)
+
+        # Combineer address velden
+        full_address = address
+        if address2:
+            full_address = f"{address}, {address2}" if address else address2
+
+        match = matcher.match(company_name, domain, min_confidence) if matcher else None
+
+        yield (company_name, domain, normalize_phone(phone), city, postal_code, province,
+               country, description, industry, full_address, address2,
+               customer_match_key(company_name), domain_key(domain),
+               match.customer_id if match else None, match.score if match else None)
+
+def values_tuple(values):
+    """(...) literal voor één record uit iter_hubspot_records()."""
+    return f"({', '.join(map(escape_sql_string, values))})"
+
+def insert_statement(batch):
+    """Eén multi-row INSERT INTO hubspot_import VALUES ...; voor een batch records."""
+    return f"INSERT INTO hubspot_import ({', '.join(STAGING_COLUMNS)}) VALUES\n    " + ",\n    ".join(map(values_tuple, batch)) + ";"
+
+def copy_text_field(value):
+    """Waarde in COPY text formaat ('' wordt NULL, net als escape_sql_string)."""
+    if value is None or value == '':
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def write_values(out, records, batch_size=DEFAULT_BATCH_SIZE):
+    """Schrijft records als INSERT statements van batch_size rijen; geeft het aantal rijen terug."""
+    out.write("-- Stap 2: Insert data in temporary table\n")
+    batch_size = max(1, batch_size or DEFAULT_BATCH_SIZE)
     row_count = 0
-    with open(csv_file_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        next(reader)  # Skip header
-        
-        for row in reader:
-            if len(row) < max([i for i in col_indices.values() if i is not None] or [0]) + 1:
-                continue
-            
-            # Haal waarden op
-            company_name = row[col_indices['company_name']].strip() if col_indices['company_name'] and len(row) > col_indices['company_name'] else ''
-            website_url = row[col_indices['website_url']].strip() if col_indices['website_url'] and len(row) > col_indices['website_url'] else ''
-            domain_name = row[col_indices['domain_name']].strip() if col_indices['domain_name'] and len(row) > col_indices['domain_name'] else ''
-            phone = row[col_indices['phone']].strip() if col_indices['phone'] and len(row) > col_indices['phone'] else ''
-            city = row[col_indices['city']].strip() if col_indices['city'] and len(row) > col_indices['city'] else ''
-            postal_code = row[col_indices['postal_code']].strip() if col_indices['postal_code'] and len(row) > col_indices['postal_code'] else ''
-            province = row[col_indices['province']].strip() if col_indices['province'] and len(row) > col_indices['province'] else ''
-            country = row[col_indices['country']].strip() if col_indices['country'] and len(row) > col_indices['country'] else ''
-            description = row[col_indices['description']].strip() if col_indices['description'] and len(row) > col_indices['description'] else ''
-            industry = row[col_indices['industry']].strip() if col_indices['industry'] and len(row) > col_indices['industry'] else ''
-            address = row[col_indices['address']].strip() if col_indices['address'] and len(row) > col_indices['address'] else ''
-            address2 = row[col_indices['address2']].strip() if col_indices['address2'] and len(row) > col_indices['address2'] else ''
-            
-            # Skip lege rijen
-            if not company_name and not website_url and not domain_name:
-                continue
-            
-            # Normaliseer domain
-            domain = normalize_domain(website_url) or normalize_domain(domain_name)
-            
-            # Normaliseer phone
-            phone_normalized = normalize_phone(phone)
-            
-            # Combineer address velden
-            full_address = address
-            if address2:
-                full_address = f"{address}, {address2}" if address else address2
-            
-            # Genereer INSERT statement
-            sql_lines.append(
-                f"INSERT INTO hubspot_import VALUES ("
-                f"{escape_sql_string(company_name)}, "
-                f"{escape_sql_string(domain)}, "
-                f"{escape_sql_string(phone_normalized)}, "
-                f"{escape_sql_string(city)}, "
-                f"{escape_sql_string(postal_code)}, "
-                f"{escape_sql_string(province)}, "
-                f"{escape_sql_string(country)}, "
-                f"{escape_sql_string(description)}, "
-                f"{escape_sql_string(industry)}, "
-                f"{escape_sql_string(full_address)}, "
-                f"{escape_sql_string(address2)}"
-                f");"
-            )
-            row_count += 1
-    
-    sql_lines.extend([
+    batch = []
+    for values in records:
+        batch.append(values)
+        if len(batch) >= batch_size:
+            out.write(insert_statement(batch) + '\n')
+            row_count += len(batch)
+            batch = []
+    if batch:
+        out.write(insert_statement(batch) + '\n')
+        row_count += len(batch)
+    return row_count
+
+def write_copy(out, records):
+    """Schrijft records als één COPY ... FROM STDIN blok (uitvoeren met psql -f); geeft het aantal rijen terug."""
+    out.write("-- Stap 2: Laad data in temporary table (COPY FROM STDIN: uitvoeren met psql -f, niet in de SQL Editor)\n")
+    out.write(f"COPY hubspot_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN;\n")
+    row_count = 0
+    for values in records:
+        out.write('\t'.join(map(copy_text_field, values)) + '\n')
+        row_count += 1
+    out.write('\\.\n')
+    return row_count
+
+def _set_clause(target, source):
+    # company_name / domain match: HubSpot waarde wint als die gevuld is;
+    # name / fuzzy match (voorheen de LIKE match): alleen lege velden aanvullen.
+    kinds = ', '.join(f"'{k}'" for k in FILL_ONLY_MATCH_KINDS)
+    return (
+        f"    {target} = CASE WHEN m.match_kind IN ({kinds}) "
+        f"THEN COALESCE(NULLIF(c.{target}, ''), h.{source}) "
+        f"ELSE COALESCE(NULLIF(h.{source}, ''), c.{target}) END,"
+    )
+
+def sql_footer_lines(row_count):
+    """Stap 3-5: customers koppelen via gelijkheid op keys, één UPDATE, opruimen."""
+    candidates = "\n    UNION ALL\n".join(
+        f"    SELECT c.id AS customer_id, h.import_id, '{kind}' AS match_kind, {prio} AS priority\n"
+        f"    FROM hubspot_import h JOIN customers c ON c.{customer_key} = h.{import_key}"
+        for prio, (kind, customer_key, import_key) in enumerate(MATCH_RULES, start=1)
+    )
+    return [
         "",
         f"-- Totaal {row_count} rijen geïmporteerd",
         "",
-        "-- Stap 3: Update bestaande customers op basis van company_name (exacte match)",
-        "-- Update zowel normale velden als HubSpot velden",
-        "UPDATE customers c",
-        "SET",
-        "    phone = COALESCE(NULLIF(h.phone, ''), c.phone),",
-        "    city = COALESCE(NULLIF(h.city, ''), c.city),",
-        "    postal_code = COALESCE(NULLIF(h.postal_code, ''), c.postal_code),",
-        "    country = COALESCE(NULLIF(h.country, ''), c.country),",
-        "    address = COALESCE(NULLIF(h.address, ''), c.address),",
-        "    domain = COALESCE(NULLIF(h.domain, ''), c.domain),",
-        "    hubspot_company_name = COALESCE(NULLIF(h.company_name, ''), c.hubspot_company_name),",
-        "    hubspot_primary_domain = COALESCE(NULLIF(h.domain, ''), c.hubspot_primary_domain),",
-        "    hubspot_website_url = COALESCE(NULLIF(h.domain, ''), c.hubspot_website_url),",
-        "    hubspot_phone = COALESCE(NULLIF(h.phone, ''), c.hubspot_phone),",
-        "    hubspot_city = COALESCE(NULLIF(h.city, ''), c.hubspot_city),",
-        "    hubspot_postcode = COALESCE(NULLIF(h.postal_code, ''), c.hubspot_postcode),",
-        "    hubspot_country = COALESCE(NULLIF(h.country, ''), c.hubspot_country),",
-        "    hubspot_address1 = COALESCE(NULLIF(h.address, ''), c.hubspot_address1),",
-        "    hubspot_industry = COALESCE(NULLIF(h.industry, ''), c.hubspot_industry),",
-        "    updated_at = NOW()",
-        "FROM hubspot_import h",
-        "WHERE h.company_name IS NOT NULL",
-        "    AND h.company_name != ''",
-        "    AND LOWER(TRIM(c.company_name)) = LOWER(TRIM(h.company_name));",
+        "-- Stap 3: Koppel HubSpot rijen aan customers (gelijkheid op geïndexeerde keys)",
+        "-- Prioriteit per customer: company_name > domain > name > fuzzy; één match per customer",
+        "CREATE INDEX ON hubspot_import (company_key);",
+        "CREATE INDEX ON hubspot_import (domain_key);",
+        "ANALYZE hubspot_import;",
         "",
-        "-- Stap 4: Update bestaande customers op basis van domain (als company_name niet matcht)",
-        "UPDATE customers c",
-        "SET",
-        "    company_name = COALESCE(NULLIF(h.company_name, ''), c.company_name),",
-        "    phone = COALESCE(NULLIF(h.phone, ''), c.phone),",
-        "    city = COALESCE(NULLIF(h.city, ''), c.city),",
-        "    postal_code = COALESCE(NULLIF(h.postal_code, ''), c.postal_code),",
-        "    country = COALESCE(NULLIF(h.country, ''), c.country),",
-        "    address = COALESCE(NULLIF(h.address, ''), c.address),",
-        "    domain = COALESCE(NULLIF(h.domain, ''), c.domain),",
-        "    hubspot_company_name = COALESCE(NULLIF(h.company_name, ''), c.hubspot_company_name),",
-        "    hubspot_primary_domain = COALESCE(NULLIF(h.domain, ''), c.hubspot_primary_domain),",
-        "    hubspot_website_url = COALESCE(NULLIF(h.domain, ''), c.hubspot_website_url),",
-        "    hubspot_phone = COALESCE(NULLIF(h.phone, ''), c.hubspot_phone),",
-        "    hubspot_city = COALESCE(NULLIF(h.city, ''), c.hubspot_city),",
-        "    hubspot_postcode = COALESCE(NULLIF(h.postal_code, ''), c.hubspot_postcode),",
-        "    hubspot_country = COALESCE(NULLIF(h.country, ''), c.hubspot_country),",
-        "    hubspot_address1 = COALESCE(NULLIF(h.address, ''), c.hubspot_address1),",
-        "    hubspot_industry = COALESCE(NULLIF(h.industry, ''), c.hubspot_industry),",
-        "    updated_at = NOW()",
-        "FROM hubspot_import h",
-        "WHERE h.domain IS NOT NULL",
-        "    AND h.domain != ''",
-        "    AND (",
-        "        LOWER(TRIM(REGEXP_REPLACE(c.domain, '^https?://', ''))) = LOWER(TRIM(h.domain))",
-        "        OR LOWER(TRIM(REGEXP_REPLACE(c.domain, '^www\\.', ''))) = LOWER(TRIM(h.domain))",
-        "        OR LOWER(TRIM(REGEXP_REPLACE(c.hubspot_primary_domain, '^https?://', ''))) = LOWER(TRIM(h.domain))",
-        "        OR LOWER(TRIM(REGEXP_REPLACE(c.hubspot_website_url, '^https?://', ''))) = LOWER(TRIM(h.domain))",
-        "    )",
-        "    AND LOWER(TRIM(c.company_name)) != LOWER(TRIM(h.company_name)); -- Alleen als company_name niet matcht",
+        "CREATE TEMP TABLE hubspot_matches AS",
+        "SELECT DISTINCT ON (m.customer_id) m.customer_id, m.import_id, m.match_kind",
+        "FROM (",
+        *candidates.split("\n"),
+        ") m",
+        "ORDER BY m.customer_id, m.priority, m.import_id;",
         "",
-        "-- Stap 5: Update bestaande customers op basis van company_name (fuzzy match - bevat)",
-        "-- Dit vult lege velden aan voor customers die gedeeltelijk matchen",
+        "SELECT match_kind, COUNT(*) AS customers FROM hubspot_matches GROUP BY match_kind ORDER BY match_kind;",
+        "",
+        "-- Stap 4: Update gematchte customers in één keer",
+        "-- Bij een domain match wordt ook company_name overgenomen uit HubSpot",
         "UPDATE customers c",
         "SET",
-        "    phone = CASE WHEN c.phone IS NULL OR c.phone = '' THEN h.phone ELSE c.phone END,",
-        "    city = CASE WHEN c.city IS NULL OR c.city = '' THEN h.city ELSE c.city END,",
-        "    postal_code = CASE WHEN c.postal_code IS NULL OR c.postal_code = '' THEN h.postal_code ELSE c.postal_code END,",
-        "    country = CASE WHEN c.country IS NULL OR c.country = '' THEN h.country ELSE c.country END,",
-        "    address = CASE WHEN c.address IS NULL OR c.address = '' THEN h.address ELSE c.address END,",
-        "    domain = CASE WHEN c.domain IS NULL OR c.domain = '' THEN h.domain ELSE c.domain END,",
-        "    hubspot_company_name = CASE WHEN c.hubspot_company_name IS NULL OR c.hubspot_company_name = '' THEN h.company_name ELSE c.hubspot_company_name END,",
-        "    hubspot_primary_domain = CASE WHEN c.hubspot_primary_domain IS NULL OR c.hubspot_primary_domain = '' THEN h.domain ELSE c.hubspot_primary_domain END,",
-        "    hubspot_website_url = CASE WHEN c.hubspot_website_url IS NULL OR c.hubspot_website_url = '' THEN h.domain ELSE c.hubspot_website_url END,",
-        "    hubspot_phone = CASE WHEN c.hubspot_phone IS NULL OR c.hubspot_phone = '' THEN h.phone ELSE c.hubspot_phone END,",
-        "    hubspot_city = CASE WHEN c.hubspot_city IS NULL OR c.hubspot_city = '' THEN h.city ELSE c.hubspot_city END,",
-        "    hubspot_postcode = CASE WHEN c.hubspot_postcode IS NULL OR c.hubspot_postcode = '' THEN h.postal_code ELSE c.hubspot_postcode END,",
-        "    hubspot_country = CASE WHEN c.hubspot_country IS NULL OR c.hubspot_country = '' THEN h.country ELSE c.hubspot_country END,",
-        "    hubspot_address1 = CASE WHEN c.hubspot_address1 IS NULL OR c.hubspot_address1 = '' THEN h.address ELSE c.hubspot_address1 END,",
-        "    hubspot_industry = CASE WHEN c.hubspot_industry IS NULL OR c.hubspot_industry = '' THEN h.industry ELSE c.hubspot_industry END,",
+        "    company_name = CASE WHEN m.match_kind = 'domain' THEN COALESCE(NULLIF(h.company_name, ''), c.company_name) ELSE c.company_name END,",
+        *(_set_clause(target, source) for target, source in CUSTOMER_FIELD_UPDATES),
         "    updated_at = NOW()",
-        "FROM hubspot_import h",
-        "WHERE h.company_name IS NOT NULL",
-        "    AND h.company_name != ''",
-        "    AND (",
-        "        LOWER(TRIM(c.company_name)) LIKE '%' || LOWER(TRIM(h.company_name)) || '%'",
-        "        OR LOWER(TRIM(h.company_name)) LIKE '%' || LOWER(TRIM(c.company_name)) || '%'",
-        "    )",
-        "    AND LOWER(TRIM(c.company_name)) != LOWER(TRIM(h.company_name)); -- Alleen als niet exact match",
+        "FROM hubspot_matches m",
+        "JOIN hubspot_import h ON h.import_id = m.import_id",
+        "WHERE c.id = m.customer_id;",
         "",
-        "-- Stap 6: Cleanup temporary table",
+        "-- Stap 5: Cleanup temporary tables",
+        "DROP TABLE IF EXISTS hubspot_matches;",
         "DROP TABLE IF EXISTS hubspot_import;",
         "",
         "-- Klaar!",
-    ])
-    
-    # Schrijf SQL naar bestand
-    with open(output_sql_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_lines))
-    
+    ]
+
+def generate_sql(csv_file_path, output_sql_path, output_format='values', batch_size=DEFAULT_BATCH_SIZE,
+                 matcher=None, min_confidence=None):
+    """
+    Genereer SQL import script (CSV wordt één keer gelezen en direct naar output_sql_path gestreamd).
+    output_format 'values': INSERT ... VALUES per batch_size rijen (Supabase SQL Editor);
+    'copy': één COPY FROM STDIN blok (psql).
+    matcher: optionele company_matcher.CompanyMatcher voor vooraf berekende fuzzy matches.
+    """
+    if output_format not in ('values', 'copy'):
+        raise ValueError(f"onbekend output_format: {output_format!r}")
+    skipped = {}
+    # Lezen, parsen, renderen en schrijven gebeurt per rij door elkaar: één stage
+    with stage('generate_sql') as st, open(csv_file_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        extract, min_len = compile_row_extractor(header, HUBSPOT_COLUMNS)
+
+        with open(output_sql_path, 'w', encoding='utf-8') as out:
+            out.write('\n'.join(SQL_HEADER_LINES) + '\n')
+
+            records = iter_hubspot_records(reader, extract, min_len, matcher, min_confidence, skipped)
+            if output_format == 'copy':
+                row_count = write_copy(out, records)
+            else:
+                row_count = write_values(out, records, batch_size)
+
+            out.write('\n'.join(sql_footer_lines(row_count)))
+        st.rows = row_count + sum(skipped.values())
+        st.bytes = os.path.getsize(output_sql_path)
+    PROFILER.count_all('hubspot.skipped', skipped)
+    PROFILER.count('sql.bytes_written', st.bytes)
+
     print(f"✅ SQL script gegenereerd: {output_sql_path}")
     print(f"📊 {row_count} rijen verwerkt")
     print(f"\n📝 Volgende stap: Voer het SQL script uit in Supabase SQL Editor")
 
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Genereer een SQL import script uit een HubSpot bedrijven export (CSV).")
+    p.add_argument('csv_file', nargs='?', default=DEFAULT_CSV_FILE)
+    p.add_argument('sql_file', nargs='?', default=DEFAULT_SQL_FILE)
+    p.add_argument(
+        '--format',
+        choices=('values', 'copy'),
+        default='values',
+        help="values: multi-row INSERT batches (Supabase SQL Editor); copy: COPY FROM STDIN blok (psql -f)",
+    )
+    p.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        metavar='N',
+        help=f"rijen per INSERT statement bij --format values (standaard {DEFAULT_BATCH_SIZE})",
+    )
+    p.add_argument(
+        '--customers',
+        default=None,
+        metavar='SNAPSHOT',
+        help="customers CSV dump of postgresql:// DSN: fuzzy matches vooraf in Python berekenen (company_matcher.py)",
+    )
+    p.add_argument(
+        '--min-confidence',
+        type=float,
+        default=None,
+        help="minimale match score voor --customers (standaard company_matcher.DEFAULT_MIN_SCORE)",
+    )
+    p.add_argument('--profile', action='store_true', help="tijd per stage en tellers naar stderr (zie import_profile.py)")
+    p.add_argument('--cprofile', default=None, metavar='PATH', help="draai onder cProfile en schrijf pstats naar PATH")
+    return p.parse_args(argv)
+
 if __name__ == '__main__':
-    import sys
-    
-    csv_file = '/Users/rogierschoenmakers/Downloads/hubspot-crm-exports-alle-bedrijven-ontbrekende-ge-2026-01-13 (1).csv'
-    sql_file = '/Users/rogierschoenmakers/Documents/Platform/gs-lead-platform/import_hubspot_data.sql'
-    
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
-    if len(sys.argv) > 2:
-        sql_file = sys.argv[2]
-    
-    generate_sql(csv_file, sql_file)
+    args = parse_args()
+    with cprofile_to(args.cprofile):
+        matcher = None
+        if args.customers:
+            from company_matcher import load_matcher
+
+            with stage('load_customers') as st:
+                matcher = load_matcher(args.customers)
+                st.rows = len(matcher.ids)
+        generate_sql(args.csv_file, args.sql_file, output_format=args.format, batch_size=args.batch_size,
+                     matcher=matcher, min_confidence=args.min_confidence)
+    if args.profile:
+        PROFILER.print_breakdown()
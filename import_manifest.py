@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Incremental invoice imports: a content-hash manifest of the last run.
+
+  python3 convert_all_invoices_to_sql.py zoho.csv eboekhouden.tsv --manifest import_manifest.json
+
+The manifest (JSON) stores one hash per (external_system, external_id) over the
+exact row values the converter emits. The next run only writes SQL for invoices
+that are new or whose hash changed; a daily import then costs O(delta), not
+O(all invoices). Invoices that are in the manifest but no longer in the exports
+can be cancelled or deleted (--missing cancel|delete); by default they're left alone.
+
+The manifest is saved after the SQL file is written (or, with --dsn, after the load),
+so only run the incremental SQL file against the database it was generated for.
+Delete the manifest to force a full import.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from convert_all_invoices_to_sql import CanonicalInvoice, _row_values, sql_quote
+
+MANIFEST_VERSION = 1
+
+MISSING_ACTIONS = ("ignore", "cancel", "delete")
+
+# Stored instead of a content hash once an invoice has been cancelled by --missing cancel:
+# it isn't cancelled again on the next run, and is upserted again if it reappears.
+CANCELLED = "cancelled"
+
+InvoiceKey = Tuple[str, str]  # (external_system, external_id)
+
+
+def invoice_key(inv: CanonicalInvoice) -> InvoiceKey:
+    # Same external_id fallback as the generated rows
+    return inv.external_system, inv.external_id or inv.invoice_number
+
+
+def content_hash(inv: CanonicalInvoice) -> str:
+    """Stable hash of everything the upsert writes for `inv`."""
+    payload = json.dumps(_row_values(inv), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ManifestDelta:
+    upserts: List[CanonicalInvoice] = field(default_factory=list)  # new + changed, in input order
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    missing: List[InvoiceKey] = field(default_factory=list)  # in the manifest, gone from the exports
+    hashes: Dict[InvoiceKey, str] = field(default_factory=dict)  # every invoice of this run
+
+    def report(self) -> Dict[str, int]:
+        return {
+            "manifest_new": self.new,
+            "manifest_changed": self.changed,
+            "manifest_unchanged": self.unchanged,
+            "manifest_missing": len(self.missing),
+        }
+
+
+@dataclass
+class ImportManifest:
+    path: Path
+    hashes: Dict[InvoiceKey, str] = field(default_factory=dict)
+
+    def delta(self, invoices: Iterable[CanonicalInvoice]) -> ManifestDelta:
+        d = ManifestDelta()
+        for inv in invoices:
+            key = invoice_key(inv)
+            h = content_hash(inv)
+            d.hashes[key] = h
+            old = self.hashes.get(key)
+            if old == h:
+                d.unchanged += 1
+                continue
+            if old is None:
+                d.new += 1
+            else:
+                d.changed += 1
+            d.upserts.append(inv)
+        d.missing = sorted(k for k, h in self.hashes.items() if k not in d.hashes and h != CANCELLED)
+        return d
+
+    def apply(self, delta: ManifestDelta, missing_action: str = "ignore") -> None:
+        """Records a successful run: current hashes plus what happened to the missing invoices."""
+        if missing_action not in MISSING_ACTIONS:
+            raise ValueError(f"unknown missing action: {missing_action!r}")
+        kept = {k: h for k, h in self.hashes.items() if k not in delta.hashes}
+        if missing_action == "cancel":
+            kept.update((k, CANCELLED) for k in delta.missing)
+        elif missing_action == "delete":
+            for k in delta.missing:
+                kept.pop(k, None)
+        kept.update(delta.hashes)
+        self.hashes = kept
+
+    def save(self) -> None:
+        invoices: Dict[str, Dict[str, str]] = {}
+        for (system, external_id), h in sorted(self.hashes.items()):
+            invoices.setdefault(system, {})[external_id] = h
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": MANIFEST_VERSION, "invoices": invoices}, ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def load_manifest(path: str) -> ImportManifest:
+    """The manifest at `path`; empty (= full import) when the file doesn't exist yet."""
+    p = Path(path)
+    if not p.exists():
+        return ImportManifest(p)
+    data = json.loads(p.read_text(encoding="utf-8"))
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {data.get('version')!r}")
+    hashes = {
+        (system, external_id): h
+        for system, by_id in data.get("invoices", {}).items()
+        for external_id, h in by_id.items()
+    }
+    return ImportManifest(p, hashes)
+
+
+def missing_invoices_statement(source: str, action: str) -> str:
+    """
+    UPDATE (cancel: status 'cancelled', nothing outstanding) or DELETE for the invoices
+    in `source`, a row source aliased m(external_system, external_id).
+    """
+    if action == "cancel":
+        return f"""UPDATE public.customer_invoices ci
+SET
+  status = 'cancelled',
+  outstanding_amount = 0,
+  updated_at = NOW()
+FROM {source}
+WHERE ci.external_system = m.external_system
+  AND ci.external_id = m.external_id
+  AND ci.status <> 'cancelled'"""
+    if action == "delete":
+        return f"""DELETE FROM public.customer_invoices ci
+USING {source}
+WHERE ci.external_system = m.external_system
+  AND ci.external_id = m.external_id"""
+    raise ValueError(f"unknown missing action: {action!r}")
+
+
+def missing_invoices_sql(keys: List[InvoiceKey], action: str) -> str:
+    """Transaction that cancels/deletes the invoices with these keys; empty for no keys or 'ignore'."""
+    if not keys or action == "ignore":
+        return ""
+    values = ",\n    ".join(f"({sql_quote(system)}, {sql_quote(external_id)})" for system, external_id in keys)
+    source = f"(\n    VALUES\n    {values}\n  ) AS m(external_system, external_id)"
+    return f"""
+-- {len(keys)} invoices no longer in the exports ({action}, see import_manifest.py)
+BEGIN;
+
+{missing_invoices_statement(source, action)};
+
+COMMIT;
+"""
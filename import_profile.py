@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Lightweight per-stage timers and counters for the converters.
+
+Stages (read, parse, merge, render, write, ...) are timed with one perf_counter()
+pair each, never per row, so this is always on; `--profile` only prints it:
+
+  python3 convert_all_invoices_to_sql.py zoho.csv eb.tsv --profile
+  python3 convert_all_invoices_to_sql.py zoho.csv eb.tsv --profile --cprofile run.pstats
+  python3 -m pstats run.pstats          # then: sort cumtime / stats 30
+
+Per stage: seconds, calls, rows (rows/s) and bytes. Counters are free-form names,
+e.g. "zoho.skipped.missing_date" or "sql.bytes_written".
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO
+
+
+@dataclass
+class StageStats:
+    seconds: float = 0.0
+    calls: int = 0
+    rows: int = 0
+    bytes: int = 0
+
+    def to_json(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"seconds": round(self.seconds, 4), "calls": self.calls}
+        if self.rows:
+            out["rows"] = self.rows
+            out["rows_per_s"] = round(self.rows / self.seconds) if self.seconds else None
+        if self.bytes:
+            out["bytes"] = self.bytes
+        return out
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Times the block; set/add .rows and .bytes on the yielded StageStats."""
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = StageStats()
+        t0 = time.perf_counter()
+        try:
+            yield st
+        finally:
+            st.seconds += time.perf_counter() - t0
+            st.calls += 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_all(self, prefix: str, counts: Dict[str, int]) -> None:
+        for name, n in counts.items():
+            self.count(f"{prefix}.{name}", n)
+
+    def merge(self, report: Dict[str, Any]) -> None:
+        """Adds another profiler's report() (e.g. a worker process's) to this one; seconds of concurrent workers add up."""
+        for name, data in report.get("stages", {}).items():
+            st = self.stages.get(name)
+            if st is None:
+                st = self.stages[name] = StageStats()
+            st.seconds += data.get("seconds", 0.0)
+            st.calls += data.get("calls", 0)
+            st.rows += data.get("rows", 0)
+            st.bytes += data.get("bytes", 0)
+        for name, n in report.get("counters", {}).items():
+            self.count(name, n)
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.counters.clear()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: st.to_json() for name, st in self.stages.items()},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def print_breakdown(self, file: Optional[TextIO] = None) -> None:
+        file = file or sys.stderr
+        total = sum(st.seconds for name, st in self.stages.items() if "." not in name) or None
+        print("⏱  stage                          seconds      %      rows     rows/s      bytes", file=file)
+        for name, st in self.stages.items():
+            share = f"{100 * st.seconds / total:5.1f}" if total and "." not in name else "    -"
+            rate = f"{st.rows / st.seconds:10.0f}" if st.rows and st.seconds else " " * 10
+            print(
+                f"   {name:<30} {st.seconds:8.3f}  {share}  {st.rows or '':>8} {rate} {st.bytes or '':>10}",
+                file=file,
+            )
+        for name, n in sorted(self.counters.items()):
+            print(f"   # {name}: {n}", file=file)
+
+
+# Process-wide profiler the converters record into
+PROFILER = Profiler()
+stage = PROFILER.stage
+count = PROFILER.count
+
+
+def timed(name: str, rows: Optional[Callable[..., int]] = None) -> Callable:
+    """Decorator: every call is timed as stage `name`; rows(*args, **kwargs) gives its row count."""
+
+    def wrap(fn: Callable) -> Callable:
+        @wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            with stage(name) as st:
+                if rows is not None:
+                    st.rows += rows(*args, **kwargs)
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
+
+
+@contextmanager
+def cprofile_to(path: Optional[str]) -> Iterator[None]:
+    """cProfile the block and dump pstats to `path` (no-op for None)."""
+    if not path:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Streaming import report (JSON Lines) for convert_all_invoices_to_sql.py.
+
+One JSON object per line, written while the import runs instead of one big dict
+dumped at the end:
+  {"type": "header", "version": 1, "started_at": "..."}
+  {"type": "zoho", "zoho_invoice_count": 40, ...}          # one line per stage
+  {"type": "overlap", "kind": "overlap", "strategy": "number", ...}   # one per record
+  ...
+  {"type": "summary", "finished_at": "...", ...}           # last line: all stage counts
+
+Memory stays flat however many overlaps there are, and a run that crashes still
+leaves everything up to the crash on disk (plus an "error" line when Python saw it).
+Read it back without loading the whole file:
+  for rec in iter_report("import_all_invoices_deduped_report.jsonl"): ...
+  read_summary("import_all_invoices_deduped_report.jsonl")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+REPORT_VERSION = 1
+
+# Record lines are flushed every this many lines; stage lines are flushed right away
+FLUSH_EVERY = 1000
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ReportWriter:
+    """Appends report lines to `path`; use as a context manager and call close(summary) at the end."""
+
+    def __init__(self, path: Path, flush_every: int = FLUSH_EVERY):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._f = open(self.path, "w", encoding="utf-8")
+        self._pending = 0
+        self.counts: Dict[str, int] = {}
+        self.write("header", version=REPORT_VERSION, started_at=_now())
+        self._f.flush()
+
+    def write(self, record_type: str, **fields: Any) -> None:
+        self._f.write(json.dumps({"type": record_type, **fields}, ensure_ascii=False, default=str) + "\n")
+        self.counts[record_type] = self.counts.get(record_type, 0) + 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def stage(self, record_type: str, data: Dict[str, Any]) -> None:
+        """A stage result (small dict of counts); flushed so it survives a later crash."""
+        self.write(record_type, **data)
+        self.flush()
+
+    def flush(self) -> None:
+        self._f.flush()
+        self._pending = 0
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        if self._f.closed:
+            return
+        if summary is not None:
+            records = {k: n for k, n in self.counts.items() if k != "header"}
+            self.write("summary", finished_at=_now(), records=records, **summary)
+        self._f.close()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and not self._f.closed:
+            self.write("error", error=f"{exc_type.__name__}: {exc}", at=_now())
+        self.close()
+
+
+def iter_report(path: str) -> Iterator[Dict[str, Any]]:
+    """Report lines one at a time; a line cut off by a crash is skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield json.loads(line)
+
+
+def read_summary(path: str, block_size: int = 64 * 1024) -> Optional[Dict[str, Any]]:
+    """The summary line (last line of a finished report) without reading the rest; None if the run didn't finish."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        tail = b""
+        pos = end
+        # Grow the tail until it holds the complete last line
+        while pos > 0:
+            pos = max(0, pos - block_size)
+            f.seek(pos)
+            tail = f.read(end - pos)
+            if tail.rstrip(b"\n").count(b"\n") >= 1 or pos == 0:
+                break
+    last = tail.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    try:
+        rec = json.loads(last)
+    except ValueError:
+        return None
+    return rec if rec.get("type") == "summary" else None
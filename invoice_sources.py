@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Source adapters: every invoice export is parsed into the same CanonicalInvoice stream.
+
+  zoho                   Zoho Books invoice export (CSV, one row per line item)
+  eboekhouden            e-boekhouden invoice export (tab separated, with a preamble)
+  eboekhouden_semicolon  e-boekhouden invoice CSV (semicolon separated)
+  missing                "facturen niet in platform" CSV (invoice_number, invoice_date, ...)
+
+The converters only pick an adapter and render; parsing, amounts (Money, exact cents),
+dates, customer aliases and skip counting live in convert_all_invoices_to_sql.py, so a
+speed-up there applies to every export. A new export (Moneybird, Exact, ...) is one
+generator that yields CanonicalInvoice objects:
+
+  @register_source("moneybird", "moneybird", "Moneybird invoice CSV")
+  def iter_moneybird_invoices(path, stats):
+      ...  # count skipped rows in stats["moneybird_skipped_rows"]
+      yield CanonicalInvoice(...)
+
+  invoices, report = read_source("moneybird", "export.csv")
+  invoices, report = read_source("zoho", "export.csv", rules=ZohoRules(notes_column=True))   # adapter options
+  python3 invoice_sources.py --list
+  python3 invoice_sources.py export.csv            # adapter detected from the header
+
+detect_source() picks the adapter from the file's header (add the export's header
+columns to export_format.SIGNATURES for a new one).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from convert_all_invoices_to_sql import (
+    EBOEKHOUDEN_IMPORT_NOTE,
+    ZERO,
+    ZOHO_RULES,
+    CanonicalInvoice,
+    LineItem,
+    Money,
+    ZohoRules,
+    EBOEKHOUDEN_SOURCES,
+    _eboekhouden_export_invoices,
+    cached_date_iso,
+    iter_eboekhouden_invoices,
+    iter_zoho_invoices,
+    normalize_customer_name,
+    normalize_invoice_number,
+    order_number_from_date,
+    parse_eboekhouden,
+    parse_zoho,
+)
+from export_format import assumed_format, open_export, sniff_export, sniff_export_or
+from import_profile import stage
+
+ParseResult = Tuple[Dict[str, CanonicalInvoice], Dict[str, Any]]
+# (path, stats, **options) -> invoices; options are adapter specific keyword arguments
+InvoiceStream = Callable[..., Iterator[CanonicalInvoice]]
+
+
+@dataclass(frozen=True)
+class SourceAdapter:
+    name: str
+    # customer_invoices.external_system of the invoices it yields (the default for exports
+    # that name the system per row, like the missing invoices CSV's source column)
+    external_system: str
+    description: str
+    iter_invoices: InvoiceStream  # (path, stats, **options) -> invoices, in file order
+    # Optional tuned reader for the whole file (fallbacks, stage timings); default collects iter_invoices
+    read: Optional[Callable[..., ParseResult]] = None
+
+
+SOURCES: Dict[str, SourceAdapter] = {}
+
+
+def register_source(
+    name: str, external_system: str, description: str, read: Optional[Callable[..., ParseResult]] = None
+) -> Callable[[InvoiceStream], InvoiceStream]:
+    """Decorator: registers an invoice stream as the adapter `name`."""
+
+    def wrap(fn: InvoiceStream) -> InvoiceStream:
+        if name in SOURCES:
+            raise ValueError(f"source {name!r} is already registered")
+        SOURCES[name] = SourceAdapter(name, external_system, description, fn, read)
+        return fn
+
+    return wrap
+
+
+def get_source(name: str) -> SourceAdapter:
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise ValueError(f"unknown source {name!r} (known: {', '.join(sorted(SOURCES))})") from None
+
+
+def iter_source(
+    name: str, path: str, stats: Optional[Dict[str, Any]] = None, **options: Any
+) -> Iterator[CanonicalInvoice]:
+    """Streams the invoices of `path` through adapter `name`; `stats` gets its counts."""
+    return get_source(name).iter_invoices(path, {} if stats is None else stats, **options)
+
+
+def detect_source(path: str) -> str:
+    """Adapter name for `path` from its header (export_format.py); ValueError for unknown files."""
+    return sniff_export(path).source
+
+
+def read_source(name: str, path: str, **options: Any) -> ParseResult:
+    """
+    ({external_id: invoice}, report) for `path`. An invoice whose external_id comes back
+    replaces the earlier one (keeping its position), like the exports' own re-imports.
+    `options` go to the adapter (e.g. zoho: rules=ZohoRules(...)).
+    """
+    adapter = get_source(name)
+    if adapter.read is not None:
+        return adapter.read(path, **options)
+    report: Dict[str, Any] = {}
+    with stage(f"parse.{name}") as st:
+        invoices = {inv.external_id or inv.invoice_number: inv for inv in adapter.iter_invoices(path, report, **options)}
+        st.rows = len(invoices)
+    report[f"{name}_invoice_count"] = len(invoices)
+    return invoices, report
+
+
+@register_source("zoho", "zoho_books", "Zoho Books invoice export (CSV, one row per line item)", read=parse_zoho)
+def _iter_zoho(path: str, stats: Dict[str, Any], rules: ZohoRules = ZOHO_RULES) -> Iterator[CanonicalInvoice]:
+    # Streams a file grouped by Invoice ID (what Zoho exports); read_source() also handles ungrouped files
+    return iter_zoho_invoices(path, stats, rules=rules)
+
+
+register_source(
+    "eboekhouden", "eboekhouden", "e-boekhouden invoice export (tab separated, with a preamble)", read=parse_eboekhouden
+)(iter_eboekhouden_invoices)
+
+
+# convert_eboekhouden_csv_to_sql.py always cut the Factuurtekst notes to this many characters
+EBOEKHOUDEN_CSV_NOTES_MAX = 500
+
+
+@register_source("eboekhouden_semicolon", "eboekhouden", "e-boekhouden invoice CSV (semicolon separated)")
+def iter_eboekhouden_csv_invoices(path: str, stats: Dict[str, Any]) -> Iterator[CanonicalInvoice]:
+    skipped: Dict[str, int] = stats.setdefault("eboekhouden_semicolon_skipped_rows", {})
+    # Takes the tab separated export as well (read through the same mmap row reader)
+    fmt = sniff_export_or(path, EBOEKHOUDEN_SOURCES, assumed_format("eboekhouden_semicolon", ";"))
+    for inv in _eboekhouden_export_invoices(path, fmt, skipped):
+        if len(inv.notes) > EBOEKHOUDEN_CSV_NOTES_MAX:
+            inv.notes = inv.notes[:EBOEKHOUDEN_CSV_NOTES_MAX]
+        yield inv
+
+
+# "Facturen niet in platform" CSV: invoices found in an accounting export but not in
+# customer_invoices, one row each. `source` is the system they came from.
+MISSING_IMPORT_NOTES = {"eboekhouden": EBOEKHOUDEN_IMPORT_NOTE, "zoho_books": "Geïmporteerd uit Zoho Books"}
+
+
+@register_source("missing", "eboekhouden", "missing invoices CSV (invoice_number, invoice_date, customer, amount_excl, amount_incl, source)")
+def iter_missing_invoices(path: str, stats: Dict[str, Any]) -> Iterator[CanonicalInvoice]:
+    skipped: Dict[str, int] = stats.setdefault("missing_skipped_rows", {})
+    fmt = sniff_export_or(path, ("missing",), assumed_format("missing", ","))
+    with open_export(path, fmt) as f:
+        for row in csv.DictReader(f, delimiter=fmt.delimiter, restval=""):
+            inv_no = normalize_invoice_number(row.get("invoice_number", ""))
+            if not inv_no:
+                skipped["missing_number"] = skipped.get("missing_number", 0) + 1
+                continue
+            inv_date = cached_date_iso(row.get("invoice_date") or "")
+            if not inv_date:
+                skipped["bad_date"] = skipped.get("bad_date", 0) + 1
+                continue
+
+            amount_excl = Money.parse(row.get("amount_excl", "0"))
+            amount_incl = Money.parse(row.get("amount_incl", "0"))
+            source = (row.get("source") or "").strip() or "eboekhouden"
+            # Credit notes (negative) are cancelled and carry no VAT
+            status = "cancelled" if amount_incl < 0 else "paid"
+            vat_amount = Money(amount_incl - amount_excl) if amount_incl >= 0 and amount_incl > amount_excl else ZERO
+
+            yield CanonicalInvoice(
+                invoice_number=inv_no,
+                invoice_date=inv_date,
+                due_date=inv_date + timedelta(days=14),
+                customer_name=normalize_customer_name(row.get("customer", "")),
+                amount_incl=Money(abs(amount_incl)),
+                outstanding_amount=ZERO,
+                status=status,
+                order_number=order_number_from_date(inv_date),
+                notes=MISSING_IMPORT_NOTES.get(source, f"Geïmporteerd uit {source}"),
+                line_items=[
+                    LineItem(
+                        description="Dienstverlening",
+                        quantity=1,
+                        unit_price=Money(abs(amount_excl)),
+                        has_vat=vat_amount > 0,
+                        subtotal=Money(abs(amount_excl)),
+                        vat_amount=vat_amount,
+                        total=Money(abs(amount_incl)),
+                    )
+                ],
+                external_id=inv_no,
+                external_system=source,
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Parse an invoice export with a registered source adapter.")
+    p.add_argument("path", nargs="?")
+    p.add_argument("--source", default=None, help="adapter name (default: detected from the header, see --list)")
+    p.add_argument("--list", action="store_true", help="list the registered adapters")
+    args = p.parse_args(argv)
+
+    if args.list or not args.path:
+        for adapter in SOURCES.values():
+            print(f"{adapter.name:<22} {adapter.external_system:<12} {adapter.description}")
+        return 0
+    source = args.source or detect_source(args.path)
+    invoices, report = read_source(source, args.path)
+    total = Money(sum(inv.amount_incl for inv in invoices.values()))
+    print(f"✅ {len(invoices)} invoices ({source}), total (incl) €{total}")
+    for key, value in report.items():
+        print(f"- {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
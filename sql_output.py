@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Buffered SQL output for the single-source converters (convert_csv_to_sql.py,
+convert_eboekhouden_csv_to_sql.py, convert_missing_invoices_to_sql.py). Their upsert
+transactions are rendered by the merged import's code (INVOICE_COLUMNS, UPSERT_SQL), so
+all converters write the same columns, external_system and notes included.
+
+Text is collected in memory and encoded + written in large blocks to a binary
+file or stdout, instead of one print() per line. Big dumps can be compressed:
+  python3 convert_eboekhouden_csv_to_sql.py export.csv -o import.sql.gz     # gzip (by suffix)
+  python3 convert_eboekhouden_csv_to_sql.py export.csv -o import.sql.zst    # zstd, needs: pip install zstandard
+  python3 convert_eboekhouden_csv_to_sql.py export.csv --compress gzip > import.sql.gz
+
+A plain -o file is checkpointed after every batch; --resume continues a run that died
+halfway instead of starting over (see import_checkpoint.py):
+  python3 convert_eboekhouden_csv_to_sql.py export.csv --batch-size 5000 -o import.sql --resume
+"""
+
+from __future__ import annotations
+
+import gzip
+import sys
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence
+
+from convert_all_invoices_to_sql import CanonicalInvoice, _values_transaction, batch_plan_digest, chunked
+from import_checkpoint import ImportCheckpoint, checkpoint_path_for, open_checkpoint, open_resumable
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for zstd output
+    zstandard = None
+
+COMPRESSIONS = ("gzip", "zstd")
+
+# Encode + write once this many characters are pending
+FLUSH_CHARS = 1 << 20
+
+
+class SqlWriter:
+    """
+    write()s are joined and encoded per FLUSH_CHARS block, then go to the binary stream in one call.
+    `offset`: where in the file writing starts (a resumed run appends to what's there).
+    """
+
+    def __init__(self, raw: BinaryIO, flush_chars: int = FLUSH_CHARS, offset: int = 0):
+        self.raw = raw
+        self.flush_chars = flush_chars
+        self.offset = offset
+        self.bytes_written = 0
+        self._parts: List[str] = []
+        self._pending = 0
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self.flush_chars:
+            self.flush()
+
+    def line(self, text: str = "") -> None:
+        self.write(text + "\n")
+
+    def flush(self) -> None:
+        if self._parts:
+            data = "".join(self._parts).encode("utf-8")
+            self.raw.write(data)
+            self.bytes_written += len(data)
+            self._parts = []
+            self._pending = 0
+
+    @property
+    def position(self) -> int:
+        """File size up to the last flush()."""
+        return self.offset + self.bytes_written
+
+
+def compression_for(path: Optional[str], compress: Optional[str] = None) -> Optional[str]:
+    """Explicit --compress, else from the file suffix (.gz / .zst)."""
+    if compress:
+        return compress
+    if path and path.endswith(".gz"):
+        return "gzip"
+    if path and path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def output_checkpoint(
+    path: Optional[str], compress: Optional[str], inputs: Dict[str, str], resume: bool = False
+) -> Optional[ImportCheckpoint]:
+    """
+    Checkpoint next to a plain output file (import_checkpoint.open_checkpoint()); None for
+    stdout and compressed output, which can't be cut back to a batch boundary.
+    """
+    if not path or path == "-" or compression_for(path, compress):
+        if resume:
+            raise ValueError("--resume needs an uncompressed -o FILE")
+        return None
+    checkpoint = open_checkpoint(checkpoint_path_for(path), inputs, resume)
+    if not checkpoint.resumed:
+        checkpoint.output = path
+    return checkpoint
+
+
+@contextmanager
+def open_output(
+    path: Optional[str] = None, compress: Optional[str] = None, checkpoint: Optional[ImportCheckpoint] = None
+) -> Iterator[SqlWriter]:
+    """
+    SqlWriter on `path` (None or '-' = stdout), optionally gzip/zstd compressed. With a
+    resumed `checkpoint` the file is cut back to its last completed batch and appended to
+    (out.offset > 0: the header is already there).
+    """
+    compress = compression_for(path, compress)
+    if compress not in (None, *COMPRESSIONS):
+        raise ValueError(f"unknown compression: {compress!r}")
+    if compress == "zstd" and zstandard is None:
+        raise RuntimeError("zstd output needs the zstandard package: pip install zstandard")
+
+    to_stdout = not path or path == "-"
+    if to_stdout:
+        sys.stdout.flush()
+        base: BinaryIO = sys.stdout.buffer
+    elif checkpoint is not None:
+        base = open_resumable(path, checkpoint, buffering=FLUSH_CHARS)
+    else:
+        base = open(path, "wb", buffering=FLUSH_CHARS)
+    if compress == "gzip":
+        raw: BinaryIO = gzip.GzipFile(fileobj=base, mode="wb", compresslevel=6)
+    elif compress == "zstd":
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(base, closefd=False)
+    else:
+        raw = base
+
+    out = SqlWriter(raw, offset=checkpoint.output_bytes if checkpoint is not None else 0)
+    try:
+        yield out
+    finally:
+        out.flush()
+        if raw is not base:
+            raw.close()
+        if to_stdout:
+            base.flush()
+        else:
+            base.close()
+
+
+def write_transactions(
+    out: SqlWriter,
+    invoices: Sequence[CanonicalInvoice],
+    batch_size: Optional[int] = None,
+    checkpoint: Optional[ImportCheckpoint] = None,
+) -> None:
+    """
+    One VALUES upsert transaction per batch of `batch_size` invoices (default: one
+    transaction), rendered like the merged import (_values_transaction() + UPSERT_SQL).
+    With a `checkpoint` every written batch is recorded and the ones it already has are skipped.
+    """
+    batches = chunked(list(invoices), batch_size)
+    if checkpoint is not None:
+        checkpoint.start(batch_plan_digest([(b, False) for b in batches], format="values"), len(batches))
+    for i, batch in enumerate(batches, 1):
+        if checkpoint is not None and checkpoint.is_done(i):
+            continue
+        out.write(_values_transaction(i, len(batches), batch, False, {}))
+        if checkpoint is not None:
+            out.flush()
+            out.raw.flush()
+            checkpoint.mark_batch(i, output_bytes=out.position)
@@ -0,0 +1,32 @@
+-- =====================================================
+-- CUSTOMER MATCH KEYS (for invoice imports)
+-- =====================================================
+-- Goal: let the invoice import scripts (convert_*_to_sql.py) resolve customers with an
+-- index lookup instead of `company_name ILIKE '%' || name || '%'` pattern scans.
+-- - customer_match_key(): lowercase, alphanumerics only ("Steck 013" = "steck013")
+-- - Stored generated key columns on customers + btree indexes
+-- Keep in sync with customer_match_key() in convert_all_invoices_to_sql.py.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION public.customer_match_key(p_name TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT NULLIF(regexp_replace(lower(p_name), '[^[:alnum:]]+', '', 'g'), '');
+$$;
+
+ALTER TABLE public.customers
+  ADD COLUMN IF NOT EXISTS company_name_key TEXT
+    GENERATED ALWAYS AS (public.customer_match_key(company_name)) STORED,
+  ADD COLUMN IF NOT EXISTS name_key TEXT
+    GENERATED ALWAYS AS (public.customer_match_key(name)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_customers_company_name_key
+  ON public.customers (company_name_key)
+  WHERE company_name_key IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_customers_name_key
+  ON public.customers (name_key)
+  WHERE name_key IS NOT NULL;
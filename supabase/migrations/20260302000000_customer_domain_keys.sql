@@ -0,0 +1,45 @@
+-- =====================================================
+-- CUSTOMER DOMAIN KEYS (for the HubSpot import)
+-- =====================================================
+-- Goal: let import_hubspot_data.py match customers on domain with an index lookup
+-- instead of LOWER(TRIM(REGEXP_REPLACE(...))) on every customer row.
+-- - customer_domain_key(): lowercase host without scheme, www. and path
+--   ("https://www.Steck013.nl/contact" = "steck013.nl")
+-- - Stored generated key columns for domain / hubspot_primary_domain / hubspot_website_url + btree indexes
+-- Keep in sync with domain_key() in import_hubspot_data.py.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION public.customer_domain_key(p_value TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT NULLIF(
+    regexp_replace(
+      regexp_replace(lower(btrim(p_value)), '^[a-z][a-z0-9+.-]*://', ''),
+      '^www\.|[/?#].*$', '', 'g'
+    ),
+    ''
+  );
+$$;
+
+ALTER TABLE public.customers
+  ADD COLUMN IF NOT EXISTS domain_key TEXT
+    GENERATED ALWAYS AS (public.customer_domain_key(domain)) STORED,
+  ADD COLUMN IF NOT EXISTS hubspot_primary_domain_key TEXT
+    GENERATED ALWAYS AS (public.customer_domain_key(hubspot_primary_domain)) STORED,
+  ADD COLUMN IF NOT EXISTS hubspot_website_url_key TEXT
+    GENERATED ALWAYS AS (public.customer_domain_key(hubspot_website_url)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_customers_domain_key
+  ON public.customers (domain_key)
+  WHERE domain_key IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_customers_hubspot_primary_domain_key
+  ON public.customers (hubspot_primary_domain_key)
+  WHERE hubspot_primary_domain_key IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_customers_hubspot_website_url_key
+  ON public.customers (hubspot_website_url_key)
+  WHERE hubspot_website_url_key IS NOT NULL;